@@ -1,12 +1,12 @@
 # app.py
-import os, time, uuid, httpx, asyncio, contextlib, json
+import os, time, uuid, asyncio, contextlib, json
 from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, Literal, Dict, List
+from typing import Optional, Literal, Dict, List, Tuple
 from dotenv import load_dotenv
 
 # --- robust .env loading (handles Windows / different CWDs) ---
@@ -30,6 +30,30 @@ W_PASS = os.getenv("XMR_WALLET_RPC_PASS", "").strip()
 FEE_CAP_RATIO = float(os.getenv("OUR_FEE_MAX_RATIO", "0.15"))
 SEND_FEE_RESERVE = float(os.getenv("XMR_SEND_FEE_RESERVE", "0.00030"))
 SWEEP_INTERVAL_S = float(os.getenv("SWEEP_INTERVAL_S", "8"))
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "8"))  # concurrent swap refreshes per sweep
+SWEEP_PROVIDER_CONCURRENCY = int(os.getenv("SWEEP_PROVIDER_CONCURRENCY", "3"))  # per provider, within SWEEP_WORKERS
+SCHED_DEPOSIT_S = float(os.getenv("SCHED_DEPOSIT_S", "8"))      # poll interval while awaiting the user's deposit
+SCHED_ROUTING_S = float(os.getenv("SCHED_ROUTING_S", "5"))      # poll interval while leg-1/leg-2 are moving
+SCHED_IDLE_AFTER_S = float(os.getenv("SCHED_IDLE_AFTER_S", "1800"))  # no change for this long -> back off
+SCHED_MAX_S = float(os.getenv("SCHED_MAX_S", "600"))            # backoff ceiling
+STATUS_MIN_REFRESH_S = float(os.getenv("STATUS_MIN_REFRESH_S", "10"))  # floor between forced ?refresh=true pulls
+SSE_HEARTBEAT_S = float(os.getenv("SSE_HEARTBEAT_S", "15"))
+QUOTE_DEADLINE_S = float(os.getenv("QUOTE_DEADLINE_S", "12"))  # overall per-request budget for /api/quote
+PROVIDER_CONCURRENCY = int(os.getenv("PROVIDER_CONCURRENCY", "16"))  # in-flight calls per provider, all ops
+PROVIDER_ESTIMATE_TIMEOUT_S = float(os.getenv("PROVIDER_ESTIMATE_TIMEOUT_S", "10"))
+PROVIDER_INFO_TIMEOUT_S = float(os.getenv("PROVIDER_INFO_TIMEOUT_S", "15"))
+PROVIDER_LIMITS_TIMEOUT_S = float(os.getenv("PROVIDER_LIMITS_TIMEOUT_S", "30"))
+PROVIDER_CREATE_TIMEOUT_S = float(os.getenv("PROVIDER_CREATE_TIMEOUT_S", "0"))  # 0 = no extra cap (http timeouts apply)
+HEDGE_ESTIMATES = os.getenv("HEDGE_ESTIMATES", "0").strip().lower() in ("1", "true", "yes", "on")
+HEDGE_MIN_DELAY_S = float(os.getenv("HEDGE_MIN_DELAY_S", "0.25"))   # never hedge earlier than this
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))       # need this many latencies before trusting p90
+LEADER_ELECTION = os.getenv("LEADER_ELECTION", "auto").strip().lower()  # auto: on with SWAP_STORE=sqlite
+STORE_SYNC_S = float(os.getenv("STORE_SYNC_S", "1.0"))  # how often workers pull each other's swap writes
+LEG2_MAX_ATTEMPTS = int(os.getenv("LEG2_MAX_ATTEMPTS", "5"))       # provider create + rejected sends
+LEG2_RETRY_BASE_S = float(os.getenv("LEG2_RETRY_BASE_S", "15"))
+LEG2_RETRY_MAX_S = float(os.getenv("LEG2_RETRY_MAX_S", "600"))
+START_CREATE_STALE_S = float(os.getenv("START_CREATE_STALE_S", "300"))  # async start still "creating" after this -> failed
+BREAKER_OPS = {x.strip() for x in os.getenv("BREAKER_OPS", "estimate").split(",") if x.strip()}  # ops behind the breaker
 
 # ================== APP ==================
 APP_VERSION = "0.4.7"
@@ -37,50 +61,116 @@ app = FastAPI(title="Monerizer MVP", version=APP_VERSION)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 app.mount("/ui", StaticFiles(directory=os.path.join(os.path.dirname(__file__), "static"), html=True), name="ui")
 SWAPS: Dict[str, Dict] = {}
-SWAPS_LOCK = asyncio.Lock()
+SWAPS_LOCK = asyncio.Lock()  # registry lock: guards the SWAPS dict only, never held across provider/wallet IO
+_SWAP_LOCKS: Dict[str, asyncio.Lock] = {}
+_SWAP_LOCK_USERS: Dict[str, int] = {}  # holders + waiters per lock; a lock nobody uses is dropped
 _last_quote_req: Optional[dict] = None  # for diagnostics
 
 # ====== Providers (moved out) ======
 from providers import (
-    cn_estimate, cn_create, cn_info,
-    ex_rate, ex_create, ex_info,
-    ss_estimate, ss_create, ss_info,
+    PROVIDERS,
+    cn_estimate, ex_rate, ss_estimate,  # raw calls used by /api/diag
     _ss_map_net, _ss_params, SS_BASE,
-    sx_estimate, sx_create, sx_info,  # [StealthEX] add imports
+    sx_cache_loop, sx_cache_info,
+)
+from services import (
+    http_client, open_http_clients, close_http_clients, http_pool_info,
+    QuoteCache, JournalSwapStore, SqliteSwapStore, IncomingTransferIndex, EventHub, PRICES, LimitsTable,
+    ProviderHealth, CircuitOpen, HedgeBudget, hedged,
+    REGISTRY, METRICS_CONTENT_TYPE, timed_lock, SqliteLease, PayoutBatcher, WorkQueue, SubaddressPool,
+    WalletLedger,
 )
 
-# ============== Persistence (very light JSON) ==============
-STORAGE_PATH = os.path.join(os.path.dirname(__file__), "swaps.json")
-
-def _load_swaps_from_disk() -> Dict[str, Dict]:
+# ================== METRICS ==================
+M_PROVIDER = REGISTRY.histogram("monerizer_provider_call_seconds", "Provider API calls.", ("provider", "op", "status"))
+M_WALLET = REGISTRY.histogram("monerizer_wallet_rpc_seconds", "monero-wallet-rpc calls.", ("method", "status"))
+M_QUOTE = REGISTRY.histogram("monerizer_quote_seconds", "POST /api/quote end to end.", ("outcome",))
+M_QUOTE_ROUTES = REGISTRY.histogram("monerizer_quote_routes", "Routes returned per quote.", (),
+                                    buckets=(0, 1, 2, 4, 6, 9, 12, 16))
+M_QUOTE_SKIPPED = REGISTRY.counter("monerizer_quote_skipped_total", "Routes not asked for a quote.", ("reason",))
+_SWEEP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+M_SWEEP = REGISTRY.histogram("monerizer_sweep_cycle_seconds",
+                             "One sweeper pass: from queueing its due swaps until the last of them is refreshed.",
+                             buckets=_SWEEP_BUCKETS)
+M_SWEEP_LAG = REGISTRY.histogram("monerizer_sweep_refresh_lag_seconds",
+                                 "From a swap being queued by the sweeper until its refresh finished.",
+                                 buckets=_SWEEP_BUCKETS)
+M_SWEEP_OLDEST = REGISTRY.gauge("monerizer_sweep_oldest_queued_seconds", "Age of the oldest swap waiting on the sweeper.",
+                                fn=lambda: _sweep_oldest_s() or 0.0)
+M_SWEEP_SWAPS = REGISTRY.counter("monerizer_sweep_swaps_total", "Swap refreshes run by the sweeper.", ("result",))
+M_SWEEP_BACKLOG = REGISTRY.gauge("monerizer_sweep_backlog", "Swaps queued or being refreshed by the sweeper.")
+M_STORE_WRITE = REGISTRY.histogram("monerizer_store_write_seconds", "Swap persistence writes.", ("backend",))
+M_STORE_BYTES = REGISTRY.counter("monerizer_store_write_bytes_total", "Bytes written by swap persistence.", ("backend",))
+M_LOCK_WAIT = REGISTRY.histogram("monerizer_lock_wait_seconds", "Time spent waiting for swap locks.", ("lock",),
+                                 buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+REGISTRY.gauge("monerizer_swaps", "Swaps held in memory.", fn=lambda: len(SWAPS))
+REGISTRY.gauge("monerizer_subaddr_pool_free", "Pre-created subaddresses ready for new swaps.", fn=lambda: len(SUBADDRS))
+
+# ============== Persistence (snapshot + append-only journal) ==============
+STORAGE_PATH = os.getenv("SWAP_JSON_PATH", os.path.join(os.path.dirname(__file__), "swaps.json"))
+SWAP_STORE = os.getenv("SWAP_STORE", "journal").strip().lower()  # "journal" | "sqlite"
+SWAP_DB_PATH = os.getenv("SWAP_DB_PATH", os.path.join(os.path.dirname(__file__), "swaps.db"))
+
+def _make_store():
+    if SWAP_STORE == "sqlite":
+        # imports swaps.json (+ journal) on first start; bucket is late-bound (defined with the admin API)
+        return SqliteSwapStore(SWAP_DB_PATH, bucket_fn=lambda s: _compute_status_bucket(s), import_from=STORAGE_PATH)
+    return JournalSwapStore(STORAGE_PATH)
+
+STORE = _make_store()
+
+# Several workers/processes may share the sqlite store; a lease elects the one that runs the
+# sweeper and leg-2 sends. Every worker serves quotes, starts and status.
+_SHARED_STORE = isinstance(STORE, SqliteSwapStore)
+LEASE = (SqliteLease(SWAP_DB_PATH, "sweeper")
+         if _SHARED_STORE and LEADER_ELECTION in ("auto", "1", "true", "on") else None)
+
+def _is_leader() -> bool:
+    return LEASE is None or LEASE.held()
+
+def _save_swap(swap: Dict, durable: bool = False):
+    backend = "sqlite" if isinstance(STORE, SqliteSwapStore) else "journal"
+    t0 = time.perf_counter()
     try:
-        if os.path.exists(STORAGE_PATH):
-            with open(STORAGE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict):
-                    return data
+        M_STORE_BYTES.inc(STORE.save(swap, durable=durable) or 0, backend=backend)
     except Exception:
-        pass
-    return {}
-
-def _save_swaps_to_disk():
+        if durable:
+            raise
+    M_STORE_WRITE.observe(time.perf_counter() - t0, backend=backend)
+
+def _registry_lock():
+    return timed_lock(SWAPS_LOCK, M_LOCK_WAIT, lock="registry")
+
+_BG_TASKS: set = set()
+
+def _spawn(coro) -> asyncio.Task:
+    """Fire-and-forget task that is not garbage-collected before it finishes."""
+    t = asyncio.create_task(coro)
+    _BG_TASKS.add(t)
+    t.add_done_callback(_BG_TASKS.discard)
+    return t
+
+def _swap_lock(swap_id: str) -> asyncio.Lock:
+    """Per-swap lock: serializes refreshes / leg-2 creation of one swap, independent swaps run in parallel."""
+    lk = _SWAP_LOCKS.get(swap_id)
+    if lk is None:
+        lk = _SWAP_LOCKS[swap_id] = asyncio.Lock()
+    return lk
+
+@contextlib.asynccontextmanager
+async def _locked_swap(swap_id: str):
+    """Hold the swap lock (wait time in M_LOCK_WAIT); the last user out drops it, so _SWAP_LOCKS
+    only holds locks that are held or awaited."""
+    _SWAP_LOCK_USERS[swap_id] = _SWAP_LOCK_USERS.get(swap_id, 0) + 1
     try:
-        # (optional) collapse duplicate consecutive timeline entries for cleanliness
-        for s in SWAPS.values():
-            tl = s.get("timeline")
-            if isinstance(tl, list) and tl:
-                collapsed = []
-                for e in tl:
-                    if not collapsed or collapsed[-1] != e:
-                        collapsed.append(e)
-                s["timeline"] = collapsed
-
-        tmp = STORAGE_PATH + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(SWAPS, f, ensure_ascii=False, indent=2)
-        os.replace(tmp, STORAGE_PATH)
-    except Exception:
-        pass
+        async with timed_lock(_swap_lock(swap_id), M_LOCK_WAIT, lock="swap"):
+            yield
+    finally:
+        n = _SWAP_LOCK_USERS.pop(swap_id) - 1
+        if n:
+            _SWAP_LOCK_USERS[swap_id] = n
+        else:
+            _SWAP_LOCKS.pop(swap_id, None)
 
 # ================== MODELS ==================
 class QuoteRequest(BaseModel):
@@ -107,10 +197,20 @@ class RouteOption(BaseModel):
     fee: FeeBreakdown
     receive_out: float
 
+class SkippedRoute(BaseModel):
+    provider: str
+    leg: Literal["leg1","leg2"]
+    leg1_provider: Optional[str] = None  # for leg2 skips: the leg-1 route it would have continued
+    reason: str                          # "below_min" | "above_max" | "circuit_open"
+    amount: float
+    min: Optional[float] = None
+    max: Optional[float] = None
+
 class QuoteResponse(BaseModel):
     request: QuoteRequest
     options: List[RouteOption]
     best_index: int
+    skipped: List[SkippedRoute] = []
 
 class StartSwapRequest(BaseModel):
     leg1_provider: Literal["ChangeNOW","Exolix","SimpleSwap","StealthEX"]  # [StealthEX] added
@@ -135,119 +235,222 @@ class StartSwapResponse(BaseModel):
     leg1_tx_id: str
     status: str
 
+class StartSwapAccepted(BaseModel):
+    swap_id: str
+    status: str
+    status_url: str
+
+# (asset, network) legs the UIs offer; used to warm per-provider route/limit tables
+SUPPORTED_LEGS = [("BTC", "BTC"), ("ETH", "ETH"), ("LTC", "LTC"),
+                  ("USDT", "ETH"), ("USDT", "TRX"), ("USDT", "BSC"), ("USDC", "ETH")]
+
+# ================== PROVIDER CALLS ==================
+# every provider call goes through here: one place for concurrency limits, timeouts and health
+HEALTH = ProviderHealth()
+_PROVIDER_SEMS: Dict[str, asyncio.Semaphore] = {}
+_PROVIDER_TIMEOUTS = {
+    "estimate": PROVIDER_ESTIMATE_TIMEOUT_S,
+    "info": PROVIDER_INFO_TIMEOUT_S,
+    "limits": PROVIDER_LIMITS_TIMEOUT_S,
+    "create": PROVIDER_CREATE_TIMEOUT_S,
+}
+
+async def _provider_call(provider: str, op: str, *args):
+    adapter = PROVIDERS.get(provider)
+    if adapter is None:
+        raise HTTPException(400, f"Unsupported provider: {provider}")
+    sem = _PROVIDER_SEMS.get(provider)
+    if sem is None:
+        sem = _PROVIDER_SEMS[provider] = asyncio.Semaphore(max(1, PROVIDER_CONCURRENCY))
+    timeout = _PROVIDER_TIMEOUTS.get(op) or None
+    guarded = op in BREAKER_OPS
+    token = HEALTH.acquire(provider) if guarded else 0
+    if token is None:
+        M_PROVIDER.observe(0.0, provider=provider, op=op, status="circuit_open")
+        raise CircuitOpen(f"{provider} circuit open")
+    t0 = time.monotonic()
+    try:  # also covers the wait for a slot: a probe cancelled there must still hand its token back
+        async with sem:
+            t0 = time.monotonic()
+            res = await asyncio.wait_for(getattr(adapter, op)(*args), timeout)
+    except asyncio.CancelledError:
+        M_PROVIDER.observe(time.monotonic() - t0, provider=provider, op=op, status="cancelled")
+        if guarded:
+            HEALTH.release(provider, token)
+        raise
+    except Exception as e:
+        M_PROVIDER.observe(time.monotonic() - t0, provider=provider, op=op,
+                           status="timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+        if guarded:
+            HEALTH.record(provider, op, False, time.monotonic() - t0, token)
+        raise
+    M_PROVIDER.observe(time.monotonic() - t0, provider=provider, op=op, status="ok")
+    if guarded:
+        HEALTH.record(provider, op, True, time.monotonic() - t0, token)
+    return res
+
+# quote-path only: a second identical estimate once the first is slower than the provider's p90
+HEDGE = HedgeBudget()
+
+def _hedge_delay(provider: str) -> Optional[float]:
+    if not HEDGE_ESTIMATES or HEALTH.stats(provider)["calls"] < HEDGE_MIN_SAMPLES:
+        return None
+    p90 = HEALTH.latency(provider, 0.9, "estimate")
+    return None if p90 is None else max(HEDGE_MIN_DELAY_S, p90)
+
+async def _hedged_estimate(provider: str, *args) -> dict:
+    return await hedged(provider, lambda: _provider_call(provider, "estimate", *args), _hedge_delay(provider), HEDGE)
+
 # ================== HELPERS ==================
 async def coingecko_prices() -> Dict[str,float]:
-    ids = {"BTC":"bitcoin","ETH":"ethereum","USDT":"tether","USDC":"usd-coin","LTC":"litecoin","XMR":"monero"}
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    out: Dict[str, float] = {}
-    try:
-        async with httpx.AsyncClient(timeout=15) as c:
-            r = await c.get(url, params={"ids": ",".join(ids.values()), "vs_currencies":"usd"})
-            r.raise_for_status()
-            data = r.json()
-            for k, v in ids.items():
-                out[k] = float(data.get(v, {}).get("usd", 0) or 0)
-    except Exception:
-        pass
-    defaults = {"BTC":60000,"ETH":3000,"USDT":1.0,"USDC":1.0,"LTC":70,"XMR":160}
-    for k, v in defaults.items():
-        out.setdefault(k, v)
-    return out
+    # served from the background-refreshed oracle; check PRICES.is_stale() where age matters
+    return PRICES.get()
 
 # ================== QUOTE ==================
 def _mirror_fee(provider_spread_xmr: float, leg1_xmr: float) -> float:
     return float(min(max(0.0, provider_spread_xmr), max(0.0, leg1_xmr) * FEE_CAP_RATIO))
 
+QUOTE_CACHE = QuoteCache()
+
+# per-provider min/max per pair, refreshed in the background; routes that cannot succeed are not asked
+LIMITS = LimitsTable({
+    name: (lambda frm, nf, to, nt, rt, _p=name: _provider_call(_p, "limits", frm, nf, to, nt, rt))
+    for name, a in PROVIDERS.items() if a.capabilities.get("limits")
+})
+
+async def _cached_estimate(provider: str, frm: str, to: str, net_from: Optional[str], net_to: Optional[str],
+                           amount: float, rate_type: str) -> float:
+    async def _fetch() -> dict:
+        return await _hedged_estimate(provider, frm, to, amount, net_from, net_to, rate_type)
+    key = QUOTE_CACHE.key(provider, frm, to, net_from, net_to, amount, rate_type)
+    j = await QUOTE_CACHE.get_or_fetch(key, amount, _fetch)
+    return float(j.get("toAmount", 0) or 0)
+
 async def _estimate_leg1_to_xmr(provider: str, req: QuoteRequest) -> Optional[float]:
-    if provider == "ChangeNOW":
-        j = await cn_estimate(req.in_asset, "XMR", req.amount, req.in_network, None,
-                              "fixed" if req.rate_type=="fixed" else "standard")
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "Exolix":
-        j = await ex_rate(req.in_asset, req.in_network, "XMR", None, req.amount, req.rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "SimpleSwap":
-        j = await ss_estimate(req.in_asset, "XMR", req.amount, req.in_network, None, req.rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "StealthEX":  # [StealthEX]
-        j = await sx_estimate(req.in_asset, "XMR", req.amount, req.in_network, None, req.rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    return 0.0
+    return await _cached_estimate(provider, req.in_asset, "XMR", req.in_network, None, req.amount, req.rate_type)
 
 async def _estimate_leg2_from_xmr(provider: str, out_asset: str, out_network: str,
                                   xmr_in: float, rate_type: str) -> Optional[float]:
     if xmr_in <= 0: return 0.0
-    if provider == "ChangeNOW":
-        j = await cn_estimate("XMR", out_asset, xmr_in, None, out_network,
-                              "fixed" if rate_type=="fixed" else "standard")
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "Exolix":
-        j = await ex_rate("XMR", None, out_asset, out_network, xmr_in, rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "SimpleSwap":
-        j = await ss_estimate("XMR", out_asset, xmr_in, None, out_network, rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    if provider == "StealthEX":  # [StealthEX]
-        j = await sx_estimate("XMR", out_asset, xmr_in, None, out_network, rate_type)
-        return float(j.get("toAmount", 0) or 0)
-    return 0.0
+    return await _cached_estimate(provider, "XMR", out_asset, None, out_network, xmr_in, rate_type)
+
+async def _quote_routes_via(leg1_provider: str, req: QuoteRequest, providers: List[str],
+                            prices: Dict[str, float], options: List[RouteOption], skipped: List[SkippedRoute]):
+    """Leg-1 estimate for one provider, then all of its leg-2 estimates concurrently.
+    Routes are appended to `options` as soon as they resolve so a deadline keeps partial results."""
+    lim = LIMITS.check(leg1_provider, req.in_asset, req.in_network, "XMR", None, req.rate_type, req.amount)
+    if lim:
+        skipped.append(SkippedRoute(provider=leg1_provider, leg="leg1", amount=req.amount, **lim))
+        return
+    if not HEALTH.available(leg1_provider):
+        skipped.append(SkippedRoute(provider=leg1_provider, leg="leg1", reason="circuit_open", amount=req.amount))
+        return
+    try:
+        leg1_xmr = await _estimate_leg1_to_xmr(leg1_provider, req)
+    except Exception:
+        return
+    if not leg1_xmr or leg1_xmr <= 0: return
+
+    usd_in = req.amount * prices.get(req.in_asset, 0)
+    xmr_mid = prices.get("XMR", 0)
+    mid_xmr_expected = (usd_in / xmr_mid) if (usd_in > 0 and xmr_mid > 0) else 0.0
+    provider_spread_xmr = max(0.0, mid_xmr_expected - leg1_xmr)
+    our_fee = _mirror_fee(provider_spread_xmr, leg1_xmr)
+    xmr_for_leg2 = max(0.0, leg1_xmr - our_fee - SEND_FEE_RESERVE)
+
+    async def _leg2(leg2_provider: str):
+        lim = LIMITS.check(leg2_provider, "XMR", None, req.out_asset, req.out_network, req.rate_type, xmr_for_leg2)
+        if lim:
+            skipped.append(SkippedRoute(provider=leg2_provider, leg="leg2", leg1_provider=leg1_provider,
+                                        amount=xmr_for_leg2, **lim))
+            return
+        if not HEALTH.available(leg2_provider):
+            skipped.append(SkippedRoute(provider=leg2_provider, leg="leg2", leg1_provider=leg1_provider,
+                                        reason="circuit_open", amount=xmr_for_leg2))
+            return
+        try:
+            leg2_out_amt = await _estimate_leg2_from_xmr(
+                leg2_provider, req.out_asset, req.out_network, xmr_for_leg2, req.rate_type
+            )
+        except Exception:
+            return
+        if not leg2_out_amt or leg2_out_amt <= 0: return
+        options.append(RouteOption(
+            leg1=LegQuote(provider=leg1_provider, amount_from=req.amount, amount_to=leg1_xmr),
+            leg2=LegQuote(provider=leg2_provider, amount_from=xmr_for_leg2, amount_to=leg2_out_amt),
+            fee=FeeBreakdown(provider_spread_xmr=provider_spread_xmr, our_fee_xmr=our_fee, policy="mirror_provider_spread_capped"),
+            receive_out=leg2_out_amt
+        ))
+
+    # << enforce different providers in quotes
+    await asyncio.gather(*(_leg2(p) for p in providers if p != leg1_provider))
 
 @app.post("/api/quote", response_model=QuoteResponse)
 async def api_quote(req: QuoteRequest):
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        res = await _quote(req)
+        outcome = "limits" if isinstance(res, JSONResponse) else "ok"
+        return res
+    finally:
+        M_QUOTE.observe(time.perf_counter() - t0, outcome=outcome)
+
+async def _quote(req: QuoteRequest):
     global _last_quote_req
     _last_quote_req = req.model_dump()  # for diagnostics
-    providers = ["ChangeNOW", "Exolix", "SimpleSwap", "StealthEX"]  # [StealthEX] include in quotes
-
-    leg1_results: Dict[str, float] = {}
-    for p in providers:
-        try:
-            leg1_results[p] = await _estimate_leg1_to_xmr(p, req)
-        except Exception:
-            leg1_results[p] = 0.0
+    providers = list(PROVIDERS)
 
+    # Fee mirroring needs a mid price; refuse rather than quote against an old one (never
+    # refreshes inline: the last known price is used until PRICE_MAX_AGE_S)
+    if not PRICES.check_fresh():
+        raise HTTPException(503, "Price feed is stale; quotes are temporarily unavailable.")
     prices = await coingecko_prices()
-    usd_in = req.amount * prices.get(req.in_asset, 0)
-    xmr_mid = prices.get("XMR", 0)
 
+    # Fan out: all leg-1 estimates start at once; each provider's leg-2 estimates start as
+    # soon as its own leg-1 lands. Whatever finished by the deadline wins.
     options: List[RouteOption] = []
-    for leg1_provider, leg1_xmr in leg1_results.items():
-        if leg1_xmr <= 0: continue
-        mid_xmr_expected = (usd_in / xmr_mid) if (usd_in > 0 and xmr_mid > 0) else 0.0
-        provider_spread_xmr = max(0.0, mid_xmr_expected - leg1_xmr)
-        our_fee = _mirror_fee(provider_spread_xmr, leg1_xmr)
-        for leg2_provider in providers:
-            if leg2_provider == leg1_provider:  # << enforce different providers in quotes
-                continue
-            try:
-                leg2_out_amt = await _estimate_leg2_from_xmr(
-                    leg2_provider, req.out_asset, req.out_network,
-                    max(0.0, leg1_xmr - our_fee - SEND_FEE_RESERVE),
-                    req.rate_type
-                )
-            except Exception:
-                leg2_out_amt = 0.0
-            if leg2_out_amt <= 0: continue
-            options.append(RouteOption(
-                leg1=LegQuote(provider=leg1_provider, amount_from=req.amount, amount_to=leg1_xmr),
-                leg2=LegQuote(provider=leg2_provider, amount_from=max(0.0, leg1_xmr - our_fee - SEND_FEE_RESERVE), amount_to=leg2_out_amt),
-                fee=FeeBreakdown(provider_spread_xmr=provider_spread_xmr, our_fee_xmr=our_fee, policy="mirror_provider_spread_capped"),
-                receive_out=leg2_out_amt
-            ))
+    skipped: List[SkippedRoute] = []
+    tasks = [asyncio.create_task(_quote_routes_via(p, req, providers, prices, options, skipped)) for p in providers]
+    _, pending = await asyncio.wait(tasks, timeout=QUOTE_DEADLINE_S)
+    for t in pending:
+        t.cancel()
+    M_QUOTE_ROUTES.observe(len(options))
+    for x in skipped:
+        M_QUOTE_SKIPPED.inc(reason=x.reason)
+
     if not options:
+        below = [x.min for x in skipped if x.leg == "leg1" and x.reason == "below_min" and x.min]
+        above = [x.max for x in skipped if x.leg == "leg1" and x.reason == "above_max" and x.max]
+        if below or above:
+            detail = (f"Amount is below the minimum of {min(below)} {req.in_asset}." if below
+                      else f"Amount is above the maximum of {max(above)} {req.in_asset}.")
+            return JSONResponse(status_code=422, content={
+                "detail": detail,
+                "min_in": min(below) if below else None,
+                "max_in": max(above) if above else None,
+                "skipped": [x.model_dump() for x in skipped],
+            })
         raise HTTPException(502, "All providers failed to quote.")
     options_sorted = sorted(options, key=lambda x: x.receive_out, reverse=True)
-    return QuoteResponse(request=req, options=options_sorted, best_index=0)
+    return QuoteResponse(request=req, options=options_sorted, best_index=0, skipped=skipped)
 
 # ================== START ==================
 async def wallet_rpc(method: str, params: dict) -> dict:
     auth = (W_USER, W_PASS) if (W_USER or W_PASS) else None
-    async with httpx.AsyncClient(timeout=45) as c:
-        r = await c.post(WALLET_URL, json={"jsonrpc":"2.0","id":"0","method":method,"params":params}, auth=auth)
+    t0 = time.perf_counter()
+    status = "error"
+    try:
+        r = await http_client("wallet").post(WALLET_URL, json={"jsonrpc":"2.0","id":"0","method":method,"params":params}, auth=auth)
         r.raise_for_status()
         j = r.json()
         if "error" in j:
+            status = "rpc_error"
             raise HTTPException(502, str(j["error"]))
+        status = "ok"
         return j["result"]
+    finally:
+        M_WALLET.observe(time.perf_counter() - t0, method=method, status=status)
 
 def xmr_to_atomic(x: float) -> int:
     return int(round(float(x) * 1_000_000_000_000))
@@ -256,58 +459,50 @@ async def create_subaddress(label: str) -> Dict[str, str]:
     res = await wallet_rpc("create_address", {"account_index": 0, "label": label})
     return {"address": res.get("address", ""), "address_index": int(res.get("address_index", 0))}
 
+async def label_subaddress(index: int, label: str):
+    await wallet_rpc("label_address", {"index": {"major": 0, "minor": int(index)}, "label": label})
+
+# pre-created subaddresses keep create_address off the /api/start path. Workers sharing one wallet
+# each pool under their own label; only a lone process re-adopts a previous run's leftovers.
+SUBADDRS = SubaddressPool(create_subaddress, label_subaddress,
+                          tag="pool" if not _SHARED_STORE else f"pool:{uuid.uuid4().hex[:8]}")
+
+async def _subaddr_pool_loop():
+    if SUBADDRS.size and not _SHARED_STORE:
+        with contextlib.suppress(Exception):
+            res = await wallet_rpc("get_address", {"account_index": 0})
+            SUBADDRS.recover(res.get("addresses") or [], (s.get("subaddr_index") for s in list(SWAPS.values())))
+    await SUBADDRS.run()
+
+# one batched get_transfers for every subaddress, shared by status, expiry, sweeper and admin callers
+INCOMING = IncomingTransferIndex(lambda method, params: wallet_rpc(method, params))
+
 async def sum_received_for_subaddr(address_index: int) -> float:
-    total = 0.0
-    seen = set()
-    try:
-        res = await wallet_rpc("get_transfers", {"in": True, "pool": True, "account_index": 0, "subaddr_indices": [address_index]})
-        arr = []
-        arr.extend(res.get("in", []))
-        arr.extend(res.get("pool", []))
-        for t in arr:
-            key = (t.get("txid"), t.get("amount"))
-            if key in seen: continue
-            seen.add(key)
-            total += float(t.get("amount", 0))/1e12
-    except Exception:
-        pass
-    return total
+    with contextlib.suppress(Exception):
+        await INCOMING.ensure_fresh()
+    return INCOMING.received(address_index)  # last known totals if the wallet is unreachable
 
-async def wallet_unlocked_balance() -> float:
-    try:
-        res = await wallet_rpc("get_balance", {"account_index": 0})
-        return float(res.get("unlocked_balance", 0))/1e12
-    except Exception:
-        return 0.0
+# unlocked balance cached per block height, less what in-flight leg-2 sends have reserved
+LEDGER = WalletLedger(lambda method, params: wallet_rpc(method, params))
 
 async def _create_leg1_order(provider: str, req: StartSwapRequest, xmr_subaddr: str, refund_address: Optional[str]) -> Dict:
-    if provider == "ChangeNOW":
-        return await cn_create(req.in_asset, "XMR", req.amount, xmr_subaddr, req.in_network, None, "fixed" if req.rate_type=="fixed" else "standard", refund_address)
-    if provider == "Exolix":
-        return await ex_create(req.in_asset, req.in_network, "XMR", "XMR", req.amount, xmr_subaddr, req.rate_type)
-    if provider == "SimpleSwap":
-        return await ss_create(req.in_asset, "XMR", req.amount, xmr_subaddr, req.in_network, None, req.rate_type, refund_address)
-    if provider == "StealthEX":  # [StealthEX]
-        return await sx_create(req.in_asset, "XMR", req.amount, xmr_subaddr, req.in_network, None, req.rate_type, refund_address)
-    raise HTTPException(400, f"Unsupported leg1 provider: {provider}")
+    """normalized order: {'id', 'deposit_address', 'deposit_extra', 'raw'}"""
+    if provider not in PROVIDERS:
+        raise HTTPException(400, f"Unsupported leg1 provider: {provider}")
+    return await _provider_call(provider, "create", req.in_asset, "XMR", req.amount, xmr_subaddr,
+                                req.in_network, None, req.rate_type, refund_address)
 
 # ---- CHANGED: allow passing a refund address to leg-2 providers ----
 async def _create_leg2_order(provider: str, out_asset: str, out_network: str, amount_xmr: float, payout_address: str, rate_type: str, refund_address: Optional[str]) -> Dict:
-    if provider == "ChangeNOW":
-        return await cn_create("XMR", out_asset, amount_xmr, payout_address, None, out_network, "fixed" if rate_type=="fixed" else "standard", refund_address)
-    if provider == "Exolix":
-        return await ex_create("XMR", "XMR", out_asset, out_network, amount_xmr, payout_address, rate_type)
-    if provider == "SimpleSwap":
-        return await ss_create("XMR", out_asset, amount_xmr, payout_address, None, out_network, rate_type, refund_address)
-    if provider == "StealthEX":  # [StealthEX]
-        return await sx_create("XMR", out_asset, amount_xmr, payout_address, None, out_network, rate_type, refund_address)
-    raise HTTPException(400, f"Unsupported leg2 provider: {provider}")
+    if provider not in PROVIDERS:
+        raise HTTPException(400, f"Unsupported leg2 provider: {provider}")
+    return await _provider_call(provider, "create", "XMR", out_asset, amount_xmr, payout_address,
+                                None, out_network, rate_type, refund_address)
 
-@app.post("/api/start", response_model=StartSwapResponse)
-async def api_start(req: StartSwapRequest):
+def _check_start(req: StartSwapRequest):
     # If leg2 is not specified, pick a different provider than leg1
     if not req.leg2_provider:
-        for p in ["ChangeNOW", "Exolix", "SimpleSwap", "StealthEX"]:
+        for p in PROVIDERS:
             if p != req.leg1_provider:
                 req.leg2_provider = p
                 break
@@ -316,79 +511,109 @@ async def api_start(req: StartSwapRequest):
     if req.leg1_provider == req.leg2_provider:
         raise HTTPException(400, "leg2_provider must differ from leg1_provider")
 
-    swap_id = str(uuid.uuid4())
+def _new_swap(swap_id: str, req: StartSwapRequest) -> Dict:
+    """Swap record before the subaddress and leg-1 order are known (leg1.status "creating")."""
+    return {
+        "id": swap_id,
+        "created": time.time(),
+        "req": req.model_dump(),
+        "user_refund_address": req.refund_address_user or None,  # store for admin view
+        "subaddr_index": None,
+        "subaddr": None,
+        "our_fee_xmr": float(req.our_fee_xmr or 0.0),
+        # ---- NEW: persist quote-time fee info so admin math is exact ----
+        "fee": {
+            "provider_spread_xmr": float(req.provider_spread_xmr or 0.0),
+            "our_fee_xmr": float(req.our_fee_xmr or 0.0),
+        },
+        "leg1": {
+            "provider": req.leg1_provider,
+            "order": None,
+            "tx_id": "",
+            "deposit_address": None,
+            "deposit_extra": None,
+            "status": "creating"
+        },
+        "leg2": {
+            "provider": req.leg2_provider,
+            "created": False,
+            "creating": False,
+            "order": None,
+            "tx_id": "",
+            "status": "pending"
+        },
+        "timeline": ["created"],
+        "last_sent_txid": None,
+    }
 
-    sub = await create_subaddress(f"swap:{swap_id}")
-    subaddr = sub["address"]
-    subidx = sub["address_index"]
+async def _open_swap(swap: Dict, req: StartSwapRequest):
+    """Assign a subaddress and place the leg-1 order; fills `swap` in place."""
+    sub = await SUBADDRS.take(f"swap:{swap['id']}")
+    swap["subaddr_index"] = sub["address_index"]
+    swap["subaddr"] = sub["address"]
+    # on disk before any order points at it: a restart must not hand the address out again
+    _save_swap(swap, durable=True)
 
     # ---- pass customer refund (if any) to leg-1 provider ----
     refund_addr = req.refund_address_user or None
-    leg1 = await _create_leg1_order(req.leg1_provider, req, subaddr, refund_addr)
-
-    deposit_address = ""
-    deposit_extra = None
-    leg1_tx_id = ""
-    if req.leg1_provider == "ChangeNOW":
-        deposit_address = leg1.get("payinAddress") or leg1.get("payinAddressString") or ""
-        deposit_extra = leg1.get("payinExtraId") or None
-        leg1_tx_id = leg1.get("id") or leg1.get("exchangeId") or ""
-    elif req.leg1_provider == "Exolix":
-        deposit_address = leg1.get("depositAddress") or ""
-        deposit_extra = leg1.get("depositExtraId") or None
-        leg1_tx_id = leg1.get("id") or leg1.get("transaction_id") or ""
-    elif req.leg1_provider == "SimpleSwap":
-        deposit_address = leg1.get("deposit") or ""
-        deposit_extra = leg1.get("extra_id") or None
-        leg1_tx_id = leg1.get("id") or ""
-    elif req.leg1_provider == "StealthEX":  # [StealthEX] normalize fields
-        deposit_address = leg1.get("depositAddress") or ""
-        deposit_extra = leg1.get("depositExtraId") or None
-        leg1_tx_id = leg1.get("id") or ""
-
-    async with SWAPS_LOCK:
-        SWAPS[swap_id] = {
-            "id": swap_id,
-            "created": time.time(),
-            "req": req.model_dump(),
-            "user_refund_address": req.refund_address_user or None,  # store for admin view
-            "subaddr_index": subidx,
-            "subaddr": subaddr,
-            "our_fee_xmr": float(req.our_fee_xmr or 0.0),
-            # ---- NEW: persist quote-time fee info so admin math is exact ----
-            "fee": {
-                "provider_spread_xmr": float(req.provider_spread_xmr or 0.0),
-                "our_fee_xmr": float(req.our_fee_xmr or 0.0),
-            },
-            "leg1": {
-                "provider": req.leg1_provider,
-                "order": leg1,
-                "tx_id": leg1_tx_id,
-                "deposit_address": deposit_address,
-                "deposit_extra": deposit_extra,
-                "status": "waiting_deposit"
-            },
-            "leg2": {
-                "provider": req.leg2_provider,
-                "created": False,
-                "creating": False,
-                "order": None,
-                "tx_id": "",
-                "status": "pending"
-            },
-            "timeline": ["created", "waiting_deposit"],
-            "last_sent_txid": None,
-        }
-    _save_swaps_to_disk()
+    leg1 = await _create_leg1_order(req.leg1_provider, req, sub["address"], refund_addr)
+
+    swap["leg1"].update(order=leg1["raw"], tx_id=leg1["id"], deposit_address=leg1["deposit_address"],
+                        deposit_extra=leg1["deposit_extra"], status="waiting_deposit")
+    swap["timeline"].append("waiting_deposit")
+
+async def _record_swap(req: StartSwapRequest) -> Dict:
+    swap = _new_swap(str(uuid.uuid4()), req)
+    async with _registry_lock():
+        SWAPS[swap["id"]] = swap
+        _save_swap(swap)
+    return swap
+
+async def _open_recorded_swap(swap_id: str, req: StartSwapRequest) -> Optional[Exception]:
+    """_open_swap under the swap lock; a failure is recorded (leg1 "create_failed") and returned."""
+    err = None
+    async with _locked_swap(swap_id):
+        swap = SWAPS.get(swap_id)
+        if not swap:
+            return None
+        before = _event_snapshot(swap)
+        try:
+            await _open_swap(swap, req)
+        except Exception as e:
+            err = e
+            swap["leg1"]["status"] = "create_failed"
+            swap["leg1"]["error"] = e.detail if isinstance(e, HTTPException) else str(e) or type(e).__name__
+            swap["timeline"].append("create_failed")
+        _save_swap(swap)
+        _publish_changes(swap_id, before, swap)
+    return err
+
+@app.post("/api/start", response_model=StartSwapResponse)
+async def api_start(req: StartSwapRequest):
+    _check_start(req)
+    swap = await _record_swap(req)
+    err = await _open_recorded_swap(swap["id"], req)
+    if err is not None:
+        raise err
 
     return StartSwapResponse(
-        swap_id=swap_id,
-        deposit_address=deposit_address,
-        deposit_extra=deposit_extra,
-        leg1_tx_id=leg1_tx_id,
+        swap_id=swap["id"],
+        deposit_address=swap["leg1"]["deposit_address"],
+        deposit_extra=swap["leg1"]["deposit_extra"],
+        leg1_tx_id=swap["leg1"]["tx_id"],
         status="waiting_deposit"
     )
 
+@app.post("/api/start/async", response_model=StartSwapAccepted, status_code=202)
+async def api_start_async(req: StartSwapRequest):
+    """Record the swap and return at once; the subaddress and leg-1 order are created in the
+    background. Poll /api/status/{id} (or its /events) until leg1.status leaves "creating":
+    "waiting_deposit" carries leg1.deposit_address, "create_failed" carries leg1.error."""
+    _check_start(req)
+    swap = await _record_swap(req)
+    _spawn(_open_recorded_swap(swap["id"], req))
+    return StartSwapAccepted(swap_id=swap["id"], status="creating", status_url=f"/api/status/{swap['id']}")
+
 # ================== STATUS / SWEEPER ==================
 
 # ---- helpers to detect "refunded" in provider info ----
@@ -402,28 +627,34 @@ def _looks_refunded(pinfo: Dict) -> bool:
     return any(k in st for k in ["refunded", "refund", "returned", "sent back", "reimbursed"])
 
 async def _provider_info(provider: str, tx_id: str) -> Dict:
-    if provider == "ChangeNOW": return await cn_info(tx_id)
-    if provider == "Exolix": return await ex_info(tx_id)
-    if provider == "SimpleSwap": return await ss_info(tx_id)
-    if provider == "StealthEX": return await sx_info(tx_id)  # [StealthEX]
-    return {}
-
-async def _send_from_wallet_to(provider_deposit_addr: str, amount_xmr: float) -> str:
-    try:
-        res = await wallet_rpc("transfer", {
-            "account_index": 0,
-            "destinations": [{"amount": xmr_to_atomic(amount_xmr), "address": provider_deposit_addr}],
-            "priority": 2,
-            "ring_size": 11,
-            "get_tx_key": True
-        })
-        return res.get("tx_hash", "")
-    except Exception as e:
-        raise HTTPException(502, f"Wallet send error: {e}")
-
-async def _maybe_create_leg2_and_send(swap: Dict):
-    # guard against duplicate creations
-    if swap["leg2"].get("created") or swap["leg2"].get("creating"): return
+    if provider not in PROVIDERS:
+        return {}
+    return await _provider_call(provider, "info", tx_id)
+
+async def _wallet_transfer(destinations: List[Dict]) -> Dict:
+    return await wallet_rpc("transfer", {
+        "account_index": 0,
+        "destinations": destinations,
+        "priority": 2,
+        "ring_size": 11,
+        "get_tx_key": True
+    })
+
+# leg-2 payouts queued while a transfer is in flight share the next multi-destination transfer;
+# a batch the wallet rejects (HTTPException from wallet_rpc) is retried per payout
+PAYOUTS = PayoutBatcher(_wallet_transfer, retry_single=lambda e: isinstance(e, HTTPException))
+
+# ---- leg-2 execution: a durable job on the swap (swap["leg2"]["job"]) run by queue workers ----
+# states: queued -> creating -> created -> sending -> sent, or failed / needs_review.
+# "creating" and "sending" are fsynced before the provider call / transfer and leadership is
+# re-checked right before each, so a retry, restart or leader change never places a second
+# order or re-sends a payout whose outcome is unknown (those jobs become needs_review instead).
+LEG2_DONE = {"sent", "failed", "needs_review"}
+
+async def _maybe_enqueue_leg2(swap: Dict):
+    """Called from refreshes: once the deposit is in and unlocked, record a leg-2 job and queue it."""
+    leg2 = swap["leg2"]
+    if leg2.get("created") or leg2.get("creating") or leg2.get("job"): return
 
     subidx = swap["subaddr_index"]
     rx_total = await sum_received_for_subaddr(subidx)  # pool+in (mempool+confirmed)
@@ -431,61 +662,296 @@ async def _maybe_create_leg2_and_send(swap: Dict):
     if need <= 0:
         return
 
-    # Wallet-wide unlocked allowance
-    unlocked_total = await wallet_unlocked_balance()
-    if unlocked_total < need:
-        swap["leg2"]["status"] = "awaiting_wallet_unlock"
+    # Wallet-wide unlocked allowance, net of other swaps' in-flight sends
+    try:
+        funded = await LEDGER.reserve(swap["id"], xmr_to_atomic(need))
+    except Exception:
+        funded = False
+    if not funded:
+        leg2["status"] = "awaiting_wallet_unlock"
         return
 
-    # mark creating to avoid races
-    swap["leg2"]["creating"] = True
+    now = time.time()
+    leg2["job"] = {"state": "queued", "amount_xmr": need, "attempts": 0, "enqueued_at": now, "updated_at": now}
+    leg2["creating"] = True  # older readers (and _swap_phase) treat this as "leg-2 in progress"
+    leg2["status"] = "leg2_queued"
+    _save_swap(swap)
+    LEG2_QUEUE.enqueue(swap["id"])
+
+def _leg2_update(swap: Dict, **fields):
+    swap["leg2"]["job"].update(fields, updated_at=time.time())
+
+def _leg2_retry(swap: Dict, err: str) -> Optional[float]:
+    job, leg2 = swap["leg2"]["job"], swap["leg2"]
+    if job["attempts"] >= LEG2_MAX_ATTEMPTS:
+        _leg2_update(swap, state="failed", last_error=err)
+        leg2["status"] = f"leg2_create_error:{err}"
+        leg2["creating"] = False
+        LEDGER.release(swap["id"])
+        return None
+    delay = min(LEG2_RETRY_MAX_S, LEG2_RETRY_BASE_S * (2 ** (job["attempts"] - 1)))
+    _leg2_update(swap, state="created" if job.get("order_id") else "queued", last_error=err,
+                 next_at=time.time() + delay)
+    leg2["status"] = "leg2_retrying"
+    return delay
+
+async def _leg2_step(swap_id: str) -> Optional[float]:
+    """Advance one job as far as it goes; returns a retry delay, or None when finished/parked.
+    Holds the swap lock throughout, so refreshes and store syncs never interleave with it."""
+    if not _is_leader():
+        return None
+    async with _locked_swap(swap_id):
+        return await _leg2_step_locked(swap_id)
+
+async def _leg2_step_locked(swap_id: str) -> Optional[float]:
+    async with _registry_lock():
+        swap = SWAPS.get(swap_id)
+    job = ((swap or {}).get("leg2") or {}).get("job")
+    if not job or job.get("state") in LEG2_DONE or not _is_leader():
+        return None
+    leg2, req = swap["leg2"], swap["req"]
+    before = _event_snapshot(swap)
+    save = True
     try:
-        req = swap["req"]
-        leg2 = await _create_leg2_order(
-            provider=swap["leg2"]["provider"],
-            out_asset=req["out_asset"],
-            out_network=req["out_network"],
-            amount_xmr=need,
-            payout_address=req["payout_address"],
-            rate_type=req["rate_type"],
-            refund_address=swap.get("subaddr")  # always our subaddress for leg-2 refunds
-        )
-        deposit_addr = ""
-        if swap["leg2"]["provider"] == "ChangeNOW":
-            deposit_addr = leg2.get("payinAddress") or leg2.get("payinAddressString") or ""
-            swap["leg2"]["tx_id"] = leg2.get("id") or leg2.get("exchangeId") or ""
-        elif swap["leg2"]["provider"] == "Exolix":
-            deposit_addr = leg2.get("depositAddress") or ""
-            swap["leg2"]["tx_id"] = leg2.get("id") or leg2.get("transaction_id") or ""
-        elif swap["leg2"]["provider"] == "SimpleSwap":
-            deposit_addr = leg2.get("deposit") or ""
-            swap["leg2"]["tx_id"] = leg2.get("id") or ""
-        elif swap["leg2"]["provider"] == "StealthEX":  # [StealthEX]
-            deposit_addr = leg2.get("depositAddress") or ""
-            swap["leg2"]["tx_id"] = leg2.get("id") or ""
-
-        if not deposit_addr:
-            swap["leg2"]["creating"] = False
-            raise HTTPException(502, "Leg-2 provider did not return a deposit address")
-
-        tx_hash = await _send_from_wallet_to(deposit_addr, need)
-        swap["last_sent_txid"] = tx_hash
-        swap["leg2"]["order"] = leg2
-        swap["leg2"]["created"] = True
-        swap["leg2"]["status"] = "routing_xmr_to_leg2"
-        swap["timeline"].append("routing_xmr_to_leg2")
-    except Exception as e:
-        swap["leg2"]["status"] = f"leg2_create_error:{e}"
-        swap["leg2"]["creating"] = False
+        # 1) provider order, once
+        if not job.get("order_id"):
+            _leg2_update(swap, state="creating", attempts=job["attempts"] + 1)
+            _save_swap(swap, durable=True)  # a leader that finds "creating" parks it instead of ordering again
+            try:
+                order = await _create_leg2_order(
+                    provider=leg2["provider"],
+                    out_asset=req["out_asset"],
+                    out_network=req["out_network"],
+                    amount_xmr=job["amount_xmr"],
+                    payout_address=req["payout_address"],
+                    rate_type=req["rate_type"],
+                    refund_address=swap.get("subaddr")  # always our subaddress for leg-2 refunds
+                )
+            except Exception as e:
+                order, err = None, f"create: {e}"
+            if not _is_leader():
+                # the lease lapsed during the create: the next leader parks this job for review
+                save = False
+                print(f"[leg2] {swap_id}: lost the sweeper lease while creating the leg-2 order; not sending")
+                return None
+            if order is None:
+                return _leg2_retry(swap, err)
+            if not order["deposit_address"]:
+                return _leg2_retry(swap, "Leg-2 provider did not return a deposit address")
+            leg2["tx_id"] = order["id"]
+            leg2["order"] = order["raw"]
+            _leg2_update(swap, state="created", order_id=order["id"], deposit_address=order["deposit_address"])
+            _save_swap(swap)
+
+        # 2) wallet send; the intent is on disk before the payout is queued. The worker moves on:
+        # the payout flusher batches it with others and _leg2_sent records the outcome.
+        if not _is_leader():
+            save = False
+            return None
+        _leg2_update(swap, state="sending", attempts=job["attempts"] + 1)
+        _save_swap(swap, durable=True)
+        fut = PAYOUTS.submit(job["deposit_address"], xmr_to_atomic(job["amount_xmr"]))
+        fut.add_done_callback(lambda f: _spawn(_leg2_sent(swap_id, f)))
+        return None
     finally:
-        _save_swaps_to_disk()
+        if save:
+            _save_swap(swap)
+            _publish_changes(swap_id, before, swap)
+
+async def _leg2_sent(swap_id: str, fut: asyncio.Future):
+    """Record the outcome of a queued payout (tx hash, rejection -> retry, or unknown -> review)."""
+    if fut.cancelled():
+        return  # dropped before reaching the wallet (lease lost): stays "sending" for the next leader to park
+    async with _locked_swap(swap_id):
+        async with _registry_lock():
+            swap = SWAPS.get(swap_id)
+        if not swap:
+            return
+        leg2 = swap["leg2"]
+        before = _event_snapshot(swap)
+        delay = None
+        e = fut.exception()
+        if isinstance(e, HTTPException):
+            # the wallet answered with an error: nothing was sent, safe to retry (keeps its reservation)
+            LEDGER.invalidate()
+            delay = _leg2_retry(swap, f"send: {e.detail}")
+        elif e is not None:
+            _leg2_update(swap, state="needs_review", last_error=f"send outcome unknown: {e}")
+            leg2["status"] = "leg2_needs_review"
+            LEDGER.release(swap_id, spent=True)
+        elif not fut.result():
+            _leg2_update(swap, state="needs_review", last_error="wallet returned no tx hash")
+            leg2["status"] = "leg2_needs_review"
+            LEDGER.release(swap_id, spent=True)
+        else:
+            LEDGER.release(swap_id, spent=True)
+            tx_hash = fut.result()
+            _leg2_update(swap, state="sent", tx_hash=tx_hash)
+            swap["last_sent_txid"] = tx_hash
+            leg2["created"] = True
+            leg2["creating"] = False
+            leg2["status"] = "routing_xmr_to_leg2"
+            swap["timeline"].append("routing_xmr_to_leg2")
+        _save_swap(swap)
+        _publish_changes(swap_id, before, swap)
+    if delay is not None and _is_leader():
+        LEG2_QUEUE.enqueue(swap_id, delay)
+
+LEG2_QUEUE = WorkQueue(_leg2_step)
+
+def _leg2_recover():
+    """On (re)gaining the leader role: requeue unfinished jobs. A job caught mid-create or mid-send
+    may or may not have ordered/paid; it is parked for a human instead of being retried."""
+    now = time.time()
+    for sid, swap in list(SWAPS.items()):
+        job = (swap.get("leg2") or {}).get("job")
+        if not job or job.get("state") in LEG2_DONE:
+            continue
+        if job["state"] in ("creating", "sending"):
+            # a provider order or a payout may exist that was never recorded: never redo it blindly
+            _leg2_update(swap, state="needs_review", last_error=f"interrupted while {job['state']}")
+            swap["leg2"]["status"] = "leg2_needs_review"
+            _save_swap(swap)
+            continue
+        LEDGER.hold(sid, xmr_to_atomic(job["amount_xmr"]))
+        LEG2_QUEUE.enqueue(sid, max(0.0, float(job.get("next_at") or 0) - now))
+
+# ---- lifecycle phases + adaptive poll schedule (in memory; everything non-terminal is due after restart) ----
+TERMINAL_BUCKETS = {"expired", "refunded", "finished"}
+_SCHEDULE: Dict[str, Dict] = {}
+
+def _swap_phase(swap: Dict) -> str:
+    if _compute_status_bucket(swap) in TERMINAL_BUCKETS or (swap.get("leg1") or {}).get("status") == "create_failed":
+        return "terminal"
+    leg2 = swap.get("leg2") or {}
+    if leg2.get("created") or leg2.get("creating") or leg2.get("status") not in (None, "", "pending"):
+        return "routing"
+    st = _status_text(swap.get("leg1", {}).get("provider_info") or {})
+    if st and not any(w in st for w in ["waiting", "unpaid", "no payment", "await", "new", "pending"]):
+        return "routing"
+    return "awaiting_deposit"
+
+def _swap_fingerprint(swap: Dict) -> tuple:
+    leg1, leg2 = swap.get("leg1") or {}, swap.get("leg2") or {}
+    return (leg1.get("status"), _status_text(leg1.get("provider_info") or {}),
+            leg2.get("status"), _status_text(leg2.get("provider_info") or {}),
+            len(swap.get("timeline") or []), swap.get("last_sent_txid"),
+            bool(swap.get("expired")), bool(swap.get("refunded")))
+
+def _reschedule(swap_id: str, swap: Dict):
+    """Fast polling while a swap is moving, exponential backoff once it has been idle for
+    SCHED_IDLE_AFTER_S, and no polling at all once terminal."""
+    now = time.time()
+    phase = _swap_phase(swap)
+    ent = _SCHEDULE.setdefault(swap_id, {"changed_at": now, "idle_checks": 0, "fp": None})
+    fp = _swap_fingerprint(swap)
+    if fp != ent["fp"]:
+        ent.update(fp=fp, changed_at=now, idle_checks=0)
+    ent["phase"] = phase
+    ent["refreshed_at"] = now
+    if phase == "terminal":
+        ent["next"] = None
+        return
+    base = SCHED_ROUTING_S if phase == "routing" else SCHED_DEPOSIT_S
+    if now - ent["changed_at"] < SCHED_IDLE_AFTER_S:
+        ent["next"] = now + base
+    else:
+        ent["idle_checks"] += 1
+        ent["next"] = now + min(SCHED_MAX_S, base * (2 ** min(ent["idle_checks"], 16)))
+
+def _late_funded(swap: Dict) -> bool:
+    """Expired, yet XMR reached its subaddress: the leg-1 provider paid out after the expiry."""
+    leg2, subidx = swap.get("leg2") or {}, swap.get("subaddr_index")
+    return (bool(swap.get("expired")) and not swap.get("refunded") and not leg2.get("created")
+            and not leg2.get("job") and isinstance(subidx, int) and INCOMING.received(subidx) > 0)
+
+def _is_due(swap_id: str, swap: Dict, now: float) -> bool:
+    if (swap.get("leg1") or {}).get("status") == "creating":
+        return now - float(swap.get("created") or now) > START_CREATE_STALE_S  # only to fail it
+    if _late_funded(swap):
+        return True  # terminal, but the in-memory incoming index says there is XMR to route
+    ent = _SCHEDULE.get(swap_id)
+    if ent is None:
+        if _swap_phase(swap) == "terminal":
+            _SCHEDULE[swap_id] = {"phase": "terminal", "next": None, "fp": _swap_fingerprint(swap),
+                                  "changed_at": now, "idle_checks": 0}
+            return False
+        return True
+    return ent.get("next") is not None and ent["next"] <= now
+
+# ---- push: swap change events for SSE subscribers, fed by every refresh ----
+EVENTS = EventHub()
+
+def _event_snapshot(swap: Dict) -> Dict:
+    leg1, leg2 = swap.get("leg1") or {}, swap.get("leg2") or {}
+    subidx = swap.get("subaddr_index")
+    return {
+        "timeline": list(swap.get("timeline") or []),
+        "leg1": (leg1.get("status"), _status_text(leg1.get("provider_info") or {})),
+        "leg2": (leg2.get("status"), _status_text(leg2.get("provider_info") or {})),
+        "received": INCOMING.received(subidx) if isinstance(subidx, int) else 0.0,
+    }
 
-@app.get("/api/status/{swap_id}")
-async def api_status(swap_id: str):
-    async with SWAPS_LOCK:
+def _publish_changes(swap_id: str, before: Dict, swap: Dict):
+    if not EVENTS.has_subscribers(swap_id):
+        return
+    after = _event_snapshot(swap)
+    base = {"swap_id": swap_id, "ts": time.time(), "swap": swap}
+    tl0, tl1 = before["timeline"], after["timeline"]
+    added = tl1[len(tl0):] if tl1[:len(tl0)] == tl0 else [e for e in tl1 if e not in tl0]
+    if added:
+        EVENTS.publish(swap_id, {**base, "type": "timeline", "entries": added})
+    for leg in ("leg1", "leg2"):
+        if after[leg] != before[leg]:
+            EVENTS.publish(swap_id, {**base, "type": "leg_status", "leg": leg,
+                                     "status": after[leg][0], "provider_status": after[leg][1]})
+    if after["received"] > before["received"]:
+        EVENTS.publish(swap_id, {**base, "type": "deposit", "received_xmr": after["received"]})
+    if _swap_phase(swap) == "terminal":
+        EVENTS.publish(swap_id, {**base, "type": "terminal", "bucket": _compute_status_bucket(swap)})
+
+async def _fail_stale_create(swap_id: str, swap: Dict):
+    # its start task died with the worker that ran it; the user never saw a deposit address
+    async with _locked_swap(swap_id):
+        if swap["leg1"].get("status") != "creating":
+            return
+        before = _event_snapshot(swap)
+        swap["leg1"].update(status="create_failed", error="interrupted")
+        swap["timeline"].append("create_failed")
+        _save_swap(swap)
+        _reschedule(swap_id, swap)
+        _publish_changes(swap_id, before, swap)
+
+async def _refresh_swap(swap_id: str, min_interval_s: float = 0.0) -> Dict:
+    """Pull provider info + wallet receipts for one swap, apply refund/expiry rules and maybe
+    start leg-2. Run by the sweeper; status reads only trigger it via ?refresh=true."""
+    async with _registry_lock():
         swap = SWAPS.get(swap_id)
-        if not swap:
-            raise HTTPException(404, "Unknown swap id")
+    if not swap:
+        raise HTTPException(404, "Unknown swap id")
+
+    if _swap_phase(swap) == "terminal" and not _late_funded(swap):
+        return swap  # expired/refunded/finished: nothing left to ask providers or the wallet
+
+    if swap["leg1"].get("status") == "creating":
+        if time.time() - float(swap.get("created") or 0) > START_CREATE_STALE_S:
+            await _fail_stale_create(swap_id, swap)
+        return swap  # the async start task owns it until the leg-1 order exists
+
+    lk = _SWAP_LOCKS.get(swap_id)
+    if lk is not None and lk.locked() and ((swap["leg2"].get("job") or {}).get("state")) == "creating":
+        return swap  # a leg-2 job holds the lock across its provider create; don't queue behind it
+
+    async with _locked_swap(swap_id):
+        if min_interval_s > 0 and time.time() - (_SCHEDULE.get(swap_id, {}).get("refreshed_at") or 0) < min_interval_s:
+            return swap  # refreshed recently (possibly by the sweeper we just waited for)
+        before = _event_snapshot(swap)
+
+        if _late_funded(swap):
+            # deposit delivered after the expiry: back to routing, leg-2 is queued below
+            swap.pop("expired", None)
+            swap["leg1"]["status"] = "late_deposit"
+            swap.setdefault("timeline", []).append("late_deposit")
 
         # Refresh provider info (leg1)
         with contextlib.suppress(Exception):
@@ -536,6 +1002,9 @@ async def api_status(swap_id: str):
             elif (age > 2 * 60 * 60) and leg2_not_started and still_waiting and not explicitly_refunded:
                 should_expire = True
 
+            if rx_any and leg2_not_started:
+                should_expire = False  # XMR is already here: it gets routed, whatever leg-1 says
+
             if should_expire and not swap.get("expired"):
                 swap["expired"] = True
                 swap["leg1"]["status"] = "expired"
@@ -560,41 +1029,287 @@ async def api_status(swap_id: str):
                 if not tl or tl[-1] != "refunded":
                     tl.append("refunded")
 
-        # Maybe create/send leg2
+        # Leg-2 runs on the job queue; the refresh only records + enqueues it once
         with contextlib.suppress(Exception):
-            await _maybe_create_leg2_and_send(swap)
+            await _maybe_enqueue_leg2(swap)
 
-    async with SWAPS_LOCK:
-        SWAPS[swap_id] = swap
-    _save_swaps_to_disk()
+        _save_swap(swap)
+        _reschedule(swap_id, swap)
+        _publish_changes(swap_id, before, swap)
     return swap
 
-# background sweeper
-async def _sweeper():
+# ---- shared store: pull other workers' writes into memory ----
+_SYNC_PENDING: Dict[str, Dict] = {}
+
+async def _apply_synced(doc: Dict) -> bool:
+    """Merge one doc written by another worker; False if the swap is busy here (retry later)."""
+    sid = doc.get("id")
+    async with _registry_lock():
+        cur = SWAPS.get(sid)
+        if cur is None:
+            SWAPS[sid] = doc
+            return True
+    if _SWAP_LOCK_USERS.get(sid):
+        return False  # being refreshed here; never swap the doc out from under it
+    async with _locked_swap(sid):
+        before = _event_snapshot(cur)
+        cur.clear()
+        cur.update(doc)  # in place: holders of the dict see the new state
+        _publish_changes(sid, before, cur)
+    return True
+
+async def _sync_from_store():
+    if not _SHARED_STORE:
+        return
+    docs = list(_SYNC_PENDING.values()) + STORE.changes()
+    _SYNC_PENDING.clear()
+    for doc in docs:
+        if not await _apply_synced(doc):
+            _SYNC_PENDING[doc["id"]] = doc
+
+async def _store_sync_loop():
     while True:
-        await asyncio.sleep(SWEEP_INTERVAL_S)
+        await asyncio.sleep(STORE_SYNC_S)
+        with contextlib.suppress(Exception):
+            await _sync_from_store()
+
+async def _get_swap(swap_id: str) -> Optional[Dict]:
+    async with _registry_lock():
+        swap = SWAPS.get(swap_id)
+    if swap is None and _SHARED_STORE:
+        # created by another worker since our last sync
+        doc = STORE.get(swap_id)
+        if doc is not None:
+            async with _registry_lock():
+                swap = SWAPS.setdefault(swap_id, doc)
+    return swap
+
+@app.get("/api/status/{swap_id}")
+async def api_status(swap_id: str, refresh: bool = False):
+    """Served from in-memory state kept current by the sweeper. `?refresh=true` forces a live
+    refresh, at most once per STATUS_MIN_REFRESH_S per swap (on the leader; other workers
+    re-read the shared store instead)."""
+    if refresh and _is_leader():
+        return await _refresh_swap(swap_id, min_interval_s=STATUS_MIN_REFRESH_S)
+    if refresh and _SHARED_STORE:
+        doc = STORE.get(swap_id)
+        if doc is not None:
+            await _apply_synced(doc)
+    swap = await _get_swap(swap_id)
+    if not swap:
+        raise HTTPException(404, "Unknown swap id")
+    return swap
+
+@app.get("/api/status/{swap_id}/events")
+async def api_status_events(swap_id: str):
+    """Server-Sent Events: a `snapshot` first, then `timeline` / `leg_status` / `deposit` events as
+    the backend observes them, and `terminal` before the stream closes. Each event carries the swap."""
+    swap = await _get_swap(swap_id)
+    if not swap:
+        raise HTTPException(404, "Unknown swap id")
+
+    def _sse(ev: Dict) -> str:
+        return f"data: {json.dumps(ev, ensure_ascii=False, default=str)}\n\n"
+
+    async def _stream():
+        q = EVENTS.subscribe(swap_id)
         try:
-            async with SWAPS_LOCK:
-                ids = list(SWAPS.keys())
-            for sid in ids:
-                with contextlib.suppress(Exception):
-                    await api_status(sid)
+            yield f"retry: 5000\n{_sse({'type': 'snapshot', 'swap_id': swap_id, 'ts': time.time(), 'swap': swap})}"
+            if _swap_phase(swap) == "terminal":
+                yield _sse({"type": "terminal", "swap_id": swap_id, "ts": time.time(),
+                            "bucket": _compute_status_bucket(swap), "swap": swap})
+                return
+            while True:
+                try:
+                    ev = await asyncio.wait_for(q.get(), timeout=SSE_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(ev)
+                if ev.get("type") == "terminal":
+                    return
+        finally:
+            EVENTS.unsubscribe(swap_id, q)
+
+    return StreamingResponse(_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# background sweeper
+SWEEP_STATS: Dict[str, Optional[float]] = {
+    "cycles": 0, "in_progress": False, "last_cycle_started": None, "last_cycle_s": None,
+    "last_cycle_swaps": 0, "backlog": 0, "processed": 0, "errors": 0, "oldest_queued_s": None,
+}
+
+def _schedule_summary() -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for ent in list(_SCHEDULE.values()):
+        out[ent.get("phase") or "?"] = out.get(ent.get("phase") or "?", 0) + 1
+    return out
+
+def _sweep_provider_of(swap: Dict) -> str:
+    # the provider whose info endpoint dominates this swap's refresh right now
+    leg2 = swap.get("leg2") or {}
+    if leg2.get("tx_id"):
+        return leg2.get("provider") or "?"
+    return (swap.get("leg1") or {}).get("provider") or "?"
+
+# provider -> its refresh queue; long-lived, so a slow provider's backlog carries over between ticks
+# while the others keep being swept on schedule
+_SWEEP_QUEUES: Dict[str, WorkQueue] = {}
+_SWEEP_POOL = asyncio.Semaphore(max(1, SWEEP_WORKERS))  # refreshes in flight across all providers
+_SWEEP_QUEUED_AT: Dict[str, Tuple[float, Dict]] = {}  # swap id -> (queued at, its pass)
+
+def _sweep_backlog() -> int:
+    return sum(q.stats()["queued"] + q.running for q in _SWEEP_QUEUES.values())
+
+def _sweep_oldest_s() -> Optional[float]:
+    if not _SWEEP_QUEUED_AT:
+        return None
+    return round(time.monotonic() - min(t for t, _ in _SWEEP_QUEUED_AT.values()), 3)
+
+def _sweep_pass_done(cycle: Dict):
+    took = time.monotonic() - cycle["started"]
+    SWEEP_STATS["last_cycle_s"] = round(took, 3)
+    M_SWEEP.observe(took)
+
+async def _sweep_refresh(swap_id: str) -> None:
+    async with _SWEEP_POOL:
+        try:
+            await _refresh_swap(swap_id)
+            SWEEP_STATS["processed"] += 1
+            M_SWEEP_SWAPS.inc(result="ok")
         except Exception:
-            pass
+            SWEEP_STATS["errors"] += 1
+            M_SWEEP_SWAPS.inc(result="error")
+    ent = _SWEEP_QUEUED_AT.pop(swap_id, None)
+    if ent is not None:
+        queued_at, cycle = ent
+        M_SWEEP_LAG.observe(time.monotonic() - queued_at)
+        cycle["left"] -= 1
+        if not cycle["left"]:
+            _sweep_pass_done(cycle)
+    SWEEP_STATS["backlog"] = _sweep_backlog() - 1  # this one still counts as running until we return
+    M_SWEEP_BACKLOG.set(SWEEP_STATS["backlog"])
+
+def _sweep_queue(provider: str) -> WorkQueue:
+    q = _SWEEP_QUEUES.get(provider)
+    if q is None:
+        q = _SWEEP_QUEUES[provider] = WorkQueue(_sweep_refresh, workers=max(1, SWEEP_PROVIDER_CONCURRENCY))
+    q.start()
+    return q
+
+def _stop_sweep_queues():
+    for q in _SWEEP_QUEUES.values():
+        q.stop()
+    _SWEEP_QUEUES.clear()
+    _SWEEP_QUEUED_AT.clear()
+
+async def _sweep_once(wait: bool = True):
+    """Queue every due swap on its provider's queue, each drained by at most
+    SWEEP_PROVIDER_CONCURRENCY workers with SWEEP_WORKERS refreshes in flight overall. Swaps
+    still queued from an earlier pass are not queued twice. With `wait`, return once the
+    queues are drained; the sweeper does not wait, so a slow provider only delays itself.
+    The pass's duration is recorded when its last swap finishes, not when this returns."""
+    now = time.time()
+    started = time.monotonic()
+    with contextlib.suppress(Exception):
+        await INCOMING.ensure_fresh(SCHED_MAX_S)  # expired swaps are only re-checked against this index
+    async with _registry_lock():
+        due = [(sid, _sweep_provider_of(s)) for sid, s in SWAPS.items() if _is_due(sid, s, now)]
+    due = [(sid, p) for sid, p in due if not any(sid in q for q in _SWEEP_QUEUES.values())]
+    if due:
+        with contextlib.suppress(Exception):
+            await INCOMING.ensure_fresh()  # one wallet RPC serves every swap in this pass
+    cycle = {"started": started, "left": len(due)}
+    for sid, provider in due:
+        _SWEEP_QUEUED_AT[sid] = (time.monotonic(), cycle)
+        _sweep_queue(provider).enqueue(sid)
+    if not due:
+        _sweep_pass_done(cycle)
+    SWEEP_STATS["cycles"] += 1
+    SWEEP_STATS.update(last_cycle_started=time.time(), last_cycle_swaps=len(due), backlog=_sweep_backlog(),
+                       oldest_queued_s=_sweep_oldest_s())
+    M_SWEEP_BACKLOG.set(SWEEP_STATS["backlog"])
+    try:
+        if wait:
+            await asyncio.gather(*(q.join() for q in list(_SWEEP_QUEUES.values())))
+    finally:
+        SWEEP_STATS.update(in_progress=_sweep_backlog() > 0, backlog=_sweep_backlog(),
+                           oldest_queued_s=_sweep_oldest_s())
+
+async def _sweeper():
+    # the schedule decides which swaps are due; tick often enough to honour the fastest interval
+    tick = max(0.5, min(SWEEP_INTERVAL_S, SCHED_ROUTING_S, SCHED_DEPOSIT_S))
+    try:
+        while True:
+            await asyncio.sleep(tick)
+            if not _is_leader():
+                continue  # lease lapsed; the leadership loop stops us shortly
+            with contextlib.suppress(Exception):
+                await _sweep_once(wait=False)
+    finally:
+        _stop_sweep_queues()
+
+_SWEEPER_TASK: Optional[asyncio.Task] = None
+
+async def _leadership_loop():
+    """Hold (or wait for) the sweeper lease; run the sweeper only while it is held."""
+    global _SWEEPER_TASK
+    while True:
+        leader = await asyncio.to_thread(LEASE.try_acquire)
+        if leader and _SWEEPER_TASK is None:
+            with contextlib.suppress(Exception):
+                await _sync_from_store()  # start from everything the previous leader wrote
+            _SCHEDULE.clear()  # everything is due once under the new leader
+            _SWEEPER_TASK = asyncio.create_task(_sweeper())
+            LEG2_QUEUE.start()
+            _leg2_recover()
+            print(f"[lease] {LEASE.holder} is now the sweeper leader")
+        elif not leader and _SWEEPER_TASK is not None:
+            _SWEEPER_TASK.cancel()
+            _SWEEPER_TASK = None
+            LEG2_QUEUE.stop()
+            PAYOUTS.cancel_pending()  # not yet sent; their "sending" jobs are parked by the next leader
+            LEDGER.clear()  # the next leader re-books unfinished jobs
+            print(f"[lease] {LEASE.holder} lost the sweeper lease")
+        await asyncio.sleep(LEASE.ttl_s / 3)
 
 @app.on_event("startup")
 async def on_start():
     # load persisted swaps (if any)
     try:
-        loaded = _load_swaps_from_disk()
+        loaded = STORE.load()
         if isinstance(loaded, dict) and loaded:
-            async with SWAPS_LOCK:
+            async with _registry_lock():
                 SWAPS.update(loaded)
     except Exception:
         pass
-
+    asyncio.create_task(STORE.run(SWAPS))
+    asyncio.create_task(PRICES.run())
+    asyncio.create_task(sx_cache_loop(SUPPORTED_LEGS))
+    asyncio.create_task(LIMITS.run(SUPPORTED_LEGS))
+
+    open_http_clients()
+    asyncio.create_task(_subaddr_pool_loop())
+    asyncio.create_task(PAYOUTS.run())
     print(f"[startup] .env loaded={env_loaded} CN_KEY={'yes' if bool(CN_KEY) else 'no'} EX_KEY={'yes' if bool(_EX_KEY) else 'no'} SS_KEY={'yes' if bool(SS_KEY) else 'no'} SS_BASE={SS_BASE}")
-    asyncio.create_task(_sweeper())
+    if _SHARED_STORE:
+        asyncio.create_task(_store_sync_loop())
+    if LEASE is not None:
+        asyncio.create_task(_leadership_loop())
+    else:
+        asyncio.create_task(_sweeper())
+        LEG2_QUEUE.start()
+        _leg2_recover()
+
+@app.on_event("shutdown")
+async def on_stop():
+    if LEASE is not None:
+        LEASE.close()  # hand over right away instead of after the TTL
+    with contextlib.suppress(Exception):
+        await STORE.compact(SWAPS)
+    STORE.close()
+    await close_http_clients()
 
 # ---------------- Debug & Diagnostics ----------------
 @app.post("/api/quote_debug")
@@ -622,6 +1337,15 @@ async def api_diag_providers():
         "last_quote_req": _last_quote_req,
         "simpleswap_min": None,
         "simpleswap_test": None,
+        "http_pools": http_pool_info(),
+        "quote_cache": QUOTE_CACHE.stats(),
+        "swap_store": STORE.stats(),
+        "prices": PRICES.stats(),
+        "stealthex_nets": sx_cache_info(),
+        "limits": LIMITS.stats(),
+        "adapters": {n: dict(a.capabilities) for n, a in PROVIDERS.items()},
+        "health": {n: HEALTH.stats(n) for n in PROVIDERS},
+        "hedging": dict(HEDGE.stats(), enabled=HEDGE_ESTIMATES),
     }
     try:
         if _last_quote_req:
@@ -633,17 +1357,31 @@ async def api_diag_providers():
                 "fixed": ("true" if (r.get("rate_type","float")=="fixed") else "false"),
             })
             if nf: mn_params["network_from"] = nf
-            async with httpx.AsyncClient(timeout=12) as c:
-                mn = await c.get(f"{SS_BASE}/get_min", params=mn_params)
-                try: mnj = mn.json()
-                except Exception: mnj = {"_text": mn.text}
-                info["simpleswap_min"] = {"status": mn.status_code, "params": mn_params, "raw": mnj, "url": str(mn.request.url)}
+            mn = await http_client("simpleswap").get(f"{SS_BASE}/get_min", params=mn_params)
+            try: mnj = mn.json()
+            except Exception: mnj = {"_text": mn.text}
+            info["simpleswap_min"] = {"status": mn.status_code, "params": mn_params, "raw": mnj, "url": str(mn.request.url)}
             test = await ss_estimate(r["in_asset"], "XMR", r["amount"], r["in_network"], None, r.get("rate_type","float"))
             info["simpleswap_test"] = test
     except Exception as e:
         info["simpleswap_test"] = {"error": str(e)}
     return info
 
+@app.get("/api/diag/sweeper")
+async def api_diag_sweeper():
+    return {"interval_s": SWEEP_INTERVAL_S, "workers": SWEEP_WORKERS,
+            "provider_concurrency": SWEEP_PROVIDER_CONCURRENCY, "phases": _schedule_summary(),
+            "leader": _is_leader(), "lease": LEASE.stats() if LEASE is not None else None,
+            "incoming_index": INCOMING.stats(), "events": EVENTS.stats(), "payouts": PAYOUTS.stats(),
+            "queues": {p: q.stats() for p, q in _SWEEP_QUEUES.items()},
+            "leg2_queue": LEG2_QUEUE.stats(), "subaddr_pool": SUBADDRS.stats(), "wallet_ledger": LEDGER.stats(),
+            **SWEEP_STATS, "oldest_queued_s": _sweep_oldest_s()}
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition."""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/api/diag/version")
 async def api_diag_version():
     return {"version": APP_VERSION, "SS_BASE": SS_BASE}
@@ -662,7 +1400,7 @@ def _match_query(swap: Dict, q: str) -> bool:
     ql = q.lower()
     fields = [
         swap.get("id", ""),
-        swap.get("subaddr", ""),
+        swap.get("subaddr") or "",
         json.dumps(swap.get("req", {})),
         json.dumps(swap.get("leg1", {})),
         json.dumps(swap.get("leg2", {})),
@@ -679,7 +1417,7 @@ def _compute_status_bucket(swap: Dict) -> str:
         return "refunded"
 
     leg2_status = (swap.get("leg2", {}) or {}).get("status", "") or ""
-    if "error" in leg2_status.lower():
+    if "error" in leg2_status.lower() or (swap.get("leg1", {}) or {}).get("status") == "create_failed":
         return "failed"
 
     with contextlib.suppress(Exception):
@@ -700,8 +1438,12 @@ async def admin_list_swaps(
     page = max(1, int(page))
     page_size = min(100, max(1, int(page_size)))
 
+    if isinstance(STORE, SqliteSwapStore):
+        total, rows = STORE.query(status, q, (page - 1) * page_size, page_size)
+        return {"total": total, "page": page, "page_size": page_size, "items": rows}
+
     # Snapshot without holding the lock too long
-    async with SWAPS_LOCK:
+    async with _registry_lock():
         items = list(SWAPS.values())
 
     rows = []
@@ -738,7 +1480,7 @@ async def admin_list_swaps(
 
 @app.get("/api/admin/swaps/{swap_id}")
 async def admin_get_swap(swap_id: str):
-    async with SWAPS_LOCK:
+    async with _registry_lock():
         s = SWAPS.get(swap_id)
     if not s:
         raise HTTPException(404, "Swap not found")
@@ -0,0 +1,220 @@
+# bench/mocks.py
+"""Local stand-ins for ChangeNOW, Exolix, SimpleSwap, StealthEX, CoinGecko and monero-wallet-rpc.
+
+One FastAPI app, one prefix per upstream (point the *_BASE_URL / COINGECKO_URL / XMR_WALLET_RPC_URL
+env vars at it). Each upstream gets a latency distribution (log-normal around `median_ms`, with a
+`p99_ms` tail) and an `error_rate` of HTTP 500s, configured by `set_profile()`."""
+import asyncio, itertools, math, random, time, uuid
+from typing import Dict, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+UPSTREAMS = ("changenow", "exolix", "simpleswap", "stealthex", "coingecko", "wallet")
+USD = {"BTC": 60000.0, "ETH": 3000.0, "USDT": 1.0, "USDC": 1.0, "LTC": 80.0, "XMR": 150.0}
+CG_IDS = {"bitcoin": "BTC", "ethereum": "ETH", "tether": "USDT", "usd-coin": "USDC", "litecoin": "LTC", "monero": "XMR"}
+SPREAD = {"changenow": 0.990, "exolix": 0.985, "simpleswap": 0.988, "stealthex": 0.992}
+MIN_USD, MAX_USD = 5.0, 50_000.0
+
+DEFAULT_PROFILE = {"median_ms": 60.0, "p99_ms": 400.0, "error_rate": 0.0}
+PROFILE: Dict[str, dict] = {u: dict(DEFAULT_PROFILE) for u in UPSTREAMS}
+STATS: Dict[str, Dict[str, int]] = {u: {"requests": 0, "errors": 0} for u in UPSTREAMS}
+
+def set_profile(default: Optional[dict] = None, **per_upstream: dict):
+    """set_profile({"median_ms": 80}, stealthex={"error_rate": 0.2})"""
+    for u in UPSTREAMS:
+        PROFILE[u] = {**DEFAULT_PROFILE, **(default or {}), **(per_upstream.get(u) or {})}
+
+def reset_stats():
+    for u in UPSTREAMS:
+        STATS[u] = {"requests": 0, "errors": 0}
+
+def _delay_s(p: dict) -> float:
+    med = max(0.0, float(p["median_ms"]))
+    if med <= 0:
+        return 0.0
+    tail = max(med, float(p.get("p99_ms") or med))
+    sigma = math.log(tail / med) / 2.326 if tail > med else 0.0  # z(0.99)
+    return random.lognormvariate(math.log(med), sigma) / 1000.0
+
+async def _upstream(name: str) -> Optional[JSONResponse]:
+    """Apply latency; return an error response to send instead, or None."""
+    p = PROFILE[name]
+    STATS[name]["requests"] += 1
+    await asyncio.sleep(_delay_s(p))
+    if random.random() < float(p.get("error_rate") or 0):
+        STATS[name]["errors"] += 1
+        return JSONResponse({"error": "mock upstream failure"}, status_code=500)
+    return None
+
+def _convert(frm: str, to: str, amount: float, provider: str) -> float:
+    pf, pt = USD.get((frm or "").upper(), 0.0), USD.get((to or "").upper(), 0.0)
+    if pf <= 0 or pt <= 0:
+        return 0.0
+    return round(amount * pf / pt * SPREAD[provider], 8)
+
+def _limits(frm: str):
+    p = USD.get((frm or "").upper(), 0.0) or 1.0
+    return round(MIN_USD / p, 8), round(MAX_USD / p, 8)
+
+def _order_id(prefix: str) -> str:
+    return f"{prefix}{uuid.uuid4().hex[:16]}"
+
+def _addr() -> str:
+    return "mock" + uuid.uuid4().hex
+
+ORDERS: Dict[str, dict] = {}
+
+app = FastAPI(title="Monerizer bench mocks")
+
+# ---------------- ChangeNOW (/changenow/v2) ----------------
+@app.get("/changenow/v2/exchange/estimated-amount")
+async def cn_estimated(fromCurrency: str, toCurrency: str, fromAmount: float):
+    if (err := await _upstream("changenow")): return err
+    return {"fromAmount": fromAmount, "toAmount": _convert(fromCurrency, toCurrency, fromAmount, "changenow")}
+
+@app.get("/changenow/v2/exchange/range")
+async def cn_range(fromCurrency: str, toCurrency: str):
+    if (err := await _upstream("changenow")): return err
+    mn, mx = _limits(fromCurrency)
+    return {"minAmount": mn, "maxAmount": mx}
+
+@app.post("/changenow/v2/exchange")
+async def cn_create(request: Request):
+    if (err := await _upstream("changenow")): return err
+    body = await request.json()
+    oid = _order_id("cn")
+    ORDERS[oid] = {"id": oid, "status": "waiting", "payinAddress": _addr(), **body}
+    return ORDERS[oid]
+
+@app.get("/changenow/v2/exchange/by-id")
+async def cn_info(id: str):
+    if (err := await _upstream("changenow")): return err
+    return ORDERS.get(id) or {"id": id, "status": "waiting"}
+
+# ---------------- Exolix (/exolix/api/v2) ----------------
+@app.get("/exolix/api/v2/rate")
+async def ex_rate(coinFrom: str, coinTo: str, amount: float):
+    if (err := await _upstream("exolix")): return err
+    mn, mx = _limits(coinFrom)
+    return {"fromAmount": amount, "toAmount": _convert(coinFrom, coinTo, amount, "exolix"),
+            "minAmount": mn, "maxAmount": mx}
+
+@app.post("/exolix/api/v2/transactions")
+async def ex_create(request: Request):
+    if (err := await _upstream("exolix")): return err
+    body = await request.json()
+    oid = _order_id("ex")
+    ORDERS[oid] = {"id": oid, "status": "wait", "depositAddress": _addr(), **body}
+    return ORDERS[oid]
+
+@app.get("/exolix/api/v2/transactions/{tx_id}")
+async def ex_info(tx_id: str):
+    if (err := await _upstream("exolix")): return err
+    return ORDERS.get(tx_id) or {"id": tx_id, "status": "wait"}
+
+# ---------------- SimpleSwap (/simpleswap/v1) ----------------
+@app.get("/simpleswap/v1/get_estimated")
+async def ss_estimated(currency_from: str, currency_to: str, amount: float):
+    if (err := await _upstream("simpleswap")): return err
+    return str(_convert(currency_from, currency_to, amount, "simpleswap"))
+
+@app.get("/simpleswap/v1/get_min")
+async def ss_min(currency_from: str):
+    if (err := await _upstream("simpleswap")): return err
+    return str(_limits(currency_from)[0])
+
+@app.post("/simpleswap/v1/create_exchange")
+async def ss_create(request: Request):
+    if (err := await _upstream("simpleswap")): return err
+    body = await request.json()
+    oid = _order_id("ss")
+    ORDERS[oid] = {"id": oid, "status": "waiting", "address_from": _addr(), **body}
+    return ORDERS[oid]
+
+@app.get("/simpleswap/v1/get_exchange")
+async def ss_info(id: str = ""):
+    if (err := await _upstream("simpleswap")): return err
+    return ORDERS.get(id) or {"id": id, "status": "waiting"}
+
+# ---------------- StealthEX (/stealthex/v4) ----------------
+@app.post("/stealthex/v4/rates/range")
+async def sx_range(request: Request):
+    if (err := await _upstream("stealthex")): return err
+    body = await request.json()
+    route = body.get("route") or {}
+    frm, to = route.get("from") or {}, route.get("to") or {}
+    # accept only the first network candidate the app tries, like the real API does for unknown names
+    for side in (frm, to):
+        sym, net = (side.get("symbol") or "").upper(), (side.get("network") or "").lower()
+        if sym in ("USDT", "USDC") and net not in ("ethereum", "tron", "bsc"):
+            return JSONResponse({"err": {"kind": "NOT_FOUND"}}, status_code=404)
+    mn, mx = _limits(frm.get("symbol"))
+    return {"min_amount": mn, "max_amount": mx}
+
+@app.post("/stealthex/v4/exchanges")
+async def sx_create(request: Request):
+    if (err := await _upstream("stealthex")): return err
+    body = await request.json()
+    oid = _order_id("sx")
+    ORDERS[oid] = {"id": oid, "status": "waiting", "deposit": {"address": _addr(), "extra_id": None}, "request": body}
+    return ORDERS[oid]
+
+@app.get("/stealthex/v4/exchanges/{exchange_id}")
+async def sx_info(exchange_id: str):
+    if (err := await _upstream("stealthex")): return err
+    return ORDERS.get(exchange_id) or {"id": exchange_id, "status": "waiting"}
+
+# ---------------- CoinGecko (/coingecko) ----------------
+@app.get("/coingecko/simple/price")
+async def cg_price(ids: str, vs_currencies: str = "usd"):
+    if (err := await _upstream("coingecko")): return err
+    return {i: {"usd": USD[CG_IDS[i]]} for i in ids.split(",") if i in CG_IDS}
+
+# ---------------- monero-wallet-rpc (/wallet/json_rpc) ----------------
+WALLET = {"next_index": itertools.count(1), "height": 3_000_000, "unlocked": 10_000 * 10**12,
+          "incoming": {}, "labels": {}}  # incoming: subaddr index -> atomic amount
+
+def wallet_credit(index: int, xmr: float):
+    """Pretend a deposit for `index` confirmed (visible via get_transfers)."""
+    WALLET["incoming"][index] = WALLET["incoming"].get(index, 0) + int(xmr * 1e12)
+
+def _subaddr(idx: int) -> str:
+    return f"8mock{idx:08d}" + "x" * 82
+
+def _wallet_result(method: str, params: dict):
+    if method == "create_address":
+        idx = next(WALLET["next_index"])
+        WALLET["labels"][idx] = params.get("label", "")
+        return {"address": _subaddr(idx), "address_index": idx}
+    if method == "label_address":
+        WALLET["labels"][int((params.get("index") or {}).get("minor", 0))] = params.get("label", "")
+        return {}
+    if method == "get_address":
+        return {"addresses": [{"address": _subaddr(i), "address_index": i, "label": l}
+                              for i, l in WALLET["labels"].items()]}
+    if method == "get_balance":
+        return {"balance": WALLET["unlocked"], "unlocked_balance": WALLET["unlocked"]}
+    if method == "get_height":
+        return {"height": WALLET["height"]}
+    if method == "get_transfers":
+        h = WALLET["height"] - 20
+        return {"in": [{"txid": f"in{i}", "amount": amt, "height": h, "subaddr_index": {"major": 0, "minor": i}}
+                       for i, amt in WALLET["incoming"].items()], "pool": []}
+    if method == "transfer":
+        total = sum(int(d.get("amount", 0)) for d in params.get("destinations", []))
+        WALLET["unlocked"] = max(0, WALLET["unlocked"] - total)
+        return {"tx_hash": uuid.uuid4().hex + uuid.uuid4().hex, "amount": total, "fee": 30_000_000}
+    return None
+
+@app.post("/wallet/json_rpc")
+async def wallet_rpc(request: Request):
+    if (err := await _upstream("wallet")): return err
+    body = await request.json()
+    res = _wallet_result(body.get("method"), body.get("params") or {})
+    if res is None:
+        return {"jsonrpc": "2.0", "id": body.get("id"), "error": {"code": -32601, "message": "Method not found"}}
+    return {"jsonrpc": "2.0", "id": body.get("id"), "result": res}
+
+@app.get("/_stats")
+async def stats():
+    return {"profile": PROFILE, "stats": STATS, "orders": len(ORDERS), "at": time.time()}
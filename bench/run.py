@@ -0,0 +1,297 @@
+# bench/run.py
+"""Offline benchmark: runs the app against bench.mocks (no live providers, no real wallet).
+
+    python -m bench.run                                   # defaults, report to stdout
+    python -m bench.run --sweep-sizes 100,1000 --json before.json
+    python -m bench.run --median-ms 150 --p99-ms 3000 --profile '{"stealthex": {"error_rate": 0.3}}'
+
+Measures /api/quote throughput + latency, /api/start rate, one sweeper pass at each swap count,
+admin list/search latency, and leg-2 payouts (mock deposits credited, then order + batched send). Reports with the same arguments are comparable across commits."""
+import argparse, asyncio, json, os, platform, random, socket, subprocess, sys, tempfile, threading, time, uuid
+from typing import Awaitable, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench import mocks  # noqa: E402
+
+ASSETS = [("ETH", "ETH"), ("BTC", "BTC"), ("LTC", "LTC"), ("USDT", "TRX"), ("USDT", "ETH"), ("USDC", "ETH")]
+PROVIDER_NAMES = ["ChangeNOW", "Exolix", "SimpleSwap", "StealthEX"]
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_mocks(port: int):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(mocks.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("mock server did not start")
+        time.sleep(0.05)
+    return server
+
+def _configure_env(port: int, workdir: str, store: str):
+    base = f"http://127.0.0.1:{port}"
+    os.environ.update({
+        "CHANGENOW_BASE_URL": f"{base}/changenow/v2",
+        "EXOLIX_BASE_URL": f"{base}/exolix/api/v2",
+        "SIMPLESWAP_BASE_URL": f"{base}/simpleswap/v1",
+        "STEALTHEX_BASE_URL": f"{base}/stealthex/v4",
+        "COINGECKO_URL": f"{base}/coingecko/simple/price",
+        "XMR_WALLET_RPC_URL": f"{base}/wallet/json_rpc",
+        "XMR_WALLET_RPC_USER": "", "XMR_WALLET_RPC_PASS": "",
+        "SWAP_STORE": store,
+        "SWAP_JSON_PATH": os.path.join(workdir, "swaps.json"),
+        "SWAP_DB_PATH": os.path.join(workdir, "swaps.db"),
+        "STEALTHEX_CACHE_PATH": os.path.join(workdir, "stealthex_cache.json"),
+        # the bench drives sweeper passes itself; keep the background loop out of the way
+        "SWEEP_INTERVAL_S": "86400", "SCHED_DEPOSIT_S": "86400", "SCHED_ROUTING_S": "86400",
+    })
+
+def _pcts(lat: List[float]) -> dict:
+    if not lat:
+        return {"p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    s = sorted(lat)
+    q = lambda p: round(s[min(len(s) - 1, int(p * len(s)))] * 1000, 2)
+    return {"p50_ms": q(0.5), "p90_ms": q(0.9), "p99_ms": q(0.99), "max_ms": round(s[-1] * 1000, 2)}
+
+async def _load(n: int, concurrency: int, fn: Callable[[int], Awaitable[bool]]) -> dict:
+    lat: List[float] = []
+    errors = 0
+    it = iter(range(n))
+
+    async def _worker():
+        nonlocal errors
+        for i in it:
+            t0 = time.perf_counter()
+            try:
+                ok = await fn(i)
+            except Exception:
+                ok = False
+            lat.append(time.perf_counter() - t0)
+            errors += 0 if ok else 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - t0
+    return {"requests": n, "concurrency": concurrency, "errors": errors, "wall_s": round(wall, 3),
+            "rps": round(n / wall, 2) if wall > 0 else None, **_pcts(lat)}
+
+def _quote_body(i: int, distinct: bool) -> dict:
+    (ia, inet), (oa, onet) = random.Random(i).sample(ASSETS, 2)
+    base = {"ETH": 0.5, "BTC": 0.02, "LTC": 10.0, "USDT": 500.0, "USDC": 500.0}[ia]
+    amount = base * (1 + (i % 97) * 0.031) if distinct else base
+    return {"in_asset": ia, "in_network": inet, "out_asset": oa, "out_network": onet,
+            "amount": round(amount, 8), "rate_type": "float"}
+
+def _synthetic_swap(i: int, active: bool) -> Dict:
+    """Shaped like api_start's record; inactive ones are terminal (expired) and should cost nothing."""
+    p1 = PROVIDER_NAMES[i % 4]
+    p2 = PROVIDER_NAMES[(i + 1) % 4]
+    sid = str(uuid.UUID(int=random.Random(i).getrandbits(128)))
+    (ia, inet), (oa, onet) = random.Random(i).sample(ASSETS, 2)
+    swap = {
+        "id": sid, "created": time.time() - 60, "subaddr_index": 100_000 + i, "subaddr": f"8bench{i:010d}",
+        "req": {"leg1_provider": p1, "leg2_provider": p2, "in_asset": ia, "in_network": inet, "out_asset": oa,
+                "out_network": onet, "amount": 1.0, "payout_address": f"payout{i}", "rate_type": "float",
+                "our_fee_xmr": 0.0, "refund_address_user": None, "provider_spread_xmr": 0.0},
+        "user_refund_address": None, "our_fee_xmr": 0.0,
+        "fee": {"provider_spread_xmr": 0.0, "our_fee_xmr": 0.0},
+        "leg1": {"provider": p1, "order": {}, "tx_id": f"bench-{i}", "deposit_address": f"dep{i}",
+                 "deposit_extra": None, "status": "waiting_deposit"},
+        "leg2": {"provider": p2, "created": False, "creating": False, "order": None, "tx_id": "", "status": "pending"},
+        "timeline": ["created", "waiting_deposit"], "last_sent_txid": None,
+    }
+    if not active:
+        swap["expired"] = True
+        swap["timeline"].append("expired")
+    return swap
+
+def _fresh_store(monerizer, workdir: str, tag: str):
+    """Point the app at an empty store so each phase only sees its own swaps."""
+    monerizer.STORE.close()
+    monerizer.STORAGE_PATH = os.path.join(workdir, f"swaps-{tag}.json")
+    monerizer.SWAP_DB_PATH = os.path.join(workdir, f"swaps-{tag}.db")
+    monerizer.STORE = monerizer._make_store()
+
+async def _seed(monerizer, swaps: Dict[str, Dict], workdir: str, tag: str) -> float:
+    _fresh_store(monerizer, workdir, tag)
+    async with monerizer.SWAPS_LOCK:
+        monerizer.SWAPS.clear()
+        monerizer.SWAPS.update(swaps)
+    monerizer._SCHEDULE.clear()
+    t0 = time.perf_counter()
+    for s in swaps.values():
+        monerizer._save_swap(s)
+    return time.perf_counter() - t0
+
+async def _bench(args, workdir: str) -> dict:
+    import httpx
+    import app as monerizer
+
+    await monerizer.app.router.startup()
+    for _ in range(100):
+        if monerizer.PRICES.updated_at:
+            break
+        await asyncio.sleep(0.05)
+    transport = httpx.ASGITransport(app=monerizer.app)
+    report: Dict = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # ---- quotes ----
+        async def _quote(i: int) -> bool:
+            r = await client.post("/api/quote", json=_quote_body(i, not args.quote_repeat))
+            return r.status_code == 200
+        if args.warmup:
+            await _load(args.warmup, args.quote_concurrency, _quote)
+        mocks.reset_stats()
+        report["quote"] = await _load(args.quotes, args.quote_concurrency, _quote)
+        report["quote"]["upstream_requests"] = {k: v["requests"] for k, v in mocks.STATS.items()}
+
+        # ---- start ----
+        async def _start(i: int) -> bool:
+            body = _quote_body(i, True)
+            body.update(leg1_provider=PROVIDER_NAMES[i % 4], leg2_provider=PROVIDER_NAMES[(i + 1) % 4],
+                        payout_address=f"bench-payout-{i}")
+            r = await client.post("/api/start", json=body)
+            return r.status_code == 200
+        report["start"] = await _load(args.starts, args.start_concurrency, _start)
+
+        # ---- sweeper + admin at each size ----
+        report["sweeper"], report["admin"] = [], []
+        for size in args.sweep_sizes:
+            n_active = int(size * args.active_ratio)
+            swaps = {}
+            for i in range(size):
+                s = _synthetic_swap(i, i < n_active)
+                swaps[s["id"]] = s
+            seed_s = await _seed(monerizer, swaps, workdir, f"sweep{size}")
+
+            mocks.reset_stats()
+            st = monerizer.SWEEP_STATS
+            processed0, errors0 = st["processed"], st["errors"]
+            t0 = time.perf_counter()
+            await monerizer._sweep_once()
+            cycle = time.perf_counter() - t0
+            report["sweeper"].append({
+                "swaps": size, "active": n_active, "cycle_s": round(cycle, 3),
+                "refreshed": st["processed"] - processed0, "errors": st["errors"] - errors0,
+                "seed_save_s": round(seed_s, 3),
+                "upstream_requests": sum(v["requests"] for v in mocks.STATS.values()),
+            })
+
+            probe = next(iter(swaps))[:8]
+            for label, params in (("list", {}), ("list_active", {"status": "active"}),
+                                  ("search_id", {"q": probe}), ("search_payout", {"q": "payout1"})):
+                lat = []
+                for _ in range(args.admin_repeats):
+                    t0 = time.perf_counter()
+                    r = await client.get("/api/admin/swaps", params=params)
+                    lat.append(time.perf_counter() - t0)
+                    r.raise_for_status()
+                report["admin"].append({"swaps": size, "query": label, "total": r.json().get("total"), **_pcts(lat)})
+
+        # ---- leg-2 payouts: credit deposits, one sweeper pass queues the jobs, wait for the sends ----
+        if args.payouts:
+            swaps = {}
+            for i in range(args.payouts):
+                s = _synthetic_swap(i, True)
+                s["subaddr_index"] = 200_000 + i
+                mocks.wallet_credit(s["subaddr_index"], 1.0)
+                swaps[s["id"]] = s
+            await _seed(monerizer, swaps, workdir, "payouts")
+            payouts0 = dict(monerizer.PAYOUTS.stats())
+            ledger0 = monerizer.LEDGER.stats()["get_balance_calls"]
+            mocks.reset_stats()
+            t0 = time.perf_counter()
+            await monerizer.INCOMING.ensure_fresh(0)  # the earlier phases left it fresh, without these credits
+            await monerizer._sweep_once()
+            done = lambda: [s for s in swaps.values() if ((s["leg2"].get("job") or {}).get("state")) in monerizer.LEG2_DONE]
+            while len(done()) < len(swaps) and time.perf_counter() - t0 < 120:
+                await asyncio.sleep(0.05)
+            wall = time.perf_counter() - t0
+            st = monerizer.PAYOUTS.stats()
+            transfers = st["transfers"] - payouts0["transfers"]
+            sent = sum(1 for s in done() if s["leg2"]["job"]["state"] == "sent")
+            report["payouts"] = {
+                "swaps": len(swaps), "sent": sent, "not_done": len(swaps) - len(done()), "wall_s": round(wall, 3),
+                "transfers": transfers, "avg_batch": round(sent / transfers, 2) if transfers else None,
+                "largest_batch": st["largest_batch"],
+                "get_balance_calls": monerizer.LEDGER.stats()["get_balance_calls"] - ledger0,
+                "wallet_requests": mocks.STATS["wallet"]["requests"],
+            }
+    await monerizer.app.router.shutdown()
+    return report
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return ""
+
+def _print(report: dict):
+    m = report["meta"]
+    print(f"# monerizer bench  rev={m['git_rev']}  store={m['store']}  upstream median={m['profile']['median_ms']}ms "
+          f"p99={m['profile']['p99_ms']}ms err={m['profile']['error_rate']}")
+    for name in ("quote", "start"):
+        r = report[name]
+        print(f"{name:8s} n={r['requests']:<6} conc={r['concurrency']:<4} rps={r['rps']:<9} p50={r['p50_ms']}ms "
+              f"p90={r['p90_ms']}ms p99={r['p99_ms']}ms errors={r['errors']}")
+    for r in report["sweeper"]:
+        print(f"sweeper  swaps={r['swaps']:<6} active={r['active']:<6} cycle={r['cycle_s']}s refreshed={r['refreshed']} "
+              f"errors={r['errors']} upstream_requests={r['upstream_requests']}")
+    for r in report["admin"]:
+        print(f"admin    swaps={r['swaps']:<6} {r['query']:<14} total={r['total']:<6} p50={r['p50_ms']}ms p99={r['p99_ms']}ms")
+    r = report.get("payouts")
+    if r:
+        print(f"payouts  swaps={r['swaps']:<6} sent={r['sent']} not_done={r['not_done']} wall={r['wall_s']}s "
+              f"transfers={r['transfers']} avg_batch={r['avg_batch']} largest={r['largest_batch']} "
+              f"get_balance={r['get_balance_calls']} wallet_requests={r['wallet_requests']}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quotes", type=int, default=300)
+    ap.add_argument("--quote-concurrency", type=int, default=16)
+    ap.add_argument("--quote-repeat", action="store_true", help="same amount every time (measures the quote cache)")
+    ap.add_argument("--warmup", type=int, default=20, help="quotes sent before measuring")
+    ap.add_argument("--starts", type=int, default=100)
+    ap.add_argument("--start-concurrency", type=int, default=8)
+    ap.add_argument("--sweep-sizes", default="100,1000,10000")
+    ap.add_argument("--active-ratio", type=float, default=0.1, help="share of seeded swaps that are not terminal")
+    ap.add_argument("--admin-repeats", type=int, default=20)
+    ap.add_argument("--payouts", type=int, default=50, help="funded swaps taken through leg-2 (0 = skip)")
+    ap.add_argument("--store", choices=("journal", "sqlite"), default="journal")
+    ap.add_argument("--median-ms", type=float, default=mocks.DEFAULT_PROFILE["median_ms"])
+    ap.add_argument("--p99-ms", type=float, default=mocks.DEFAULT_PROFILE["p99_ms"])
+    ap.add_argument("--error-rate", type=float, default=mocks.DEFAULT_PROFILE["error_rate"])
+    ap.add_argument("--profile", default="", help='per-upstream overrides as JSON, e.g. \'{"exolix": {"median_ms": 900}}\'')
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", default="", help="also write the report to this file")
+    args = ap.parse_args(argv)
+    args.sweep_sizes = [int(x) for x in args.sweep_sizes.split(",") if x.strip()]
+
+    random.seed(args.seed)
+    default = {"median_ms": args.median_ms, "p99_ms": args.p99_ms, "error_rate": args.error_rate}
+    mocks.set_profile(default, **(json.loads(args.profile) if args.profile else {}))
+    workdir = tempfile.mkdtemp(prefix="monerizer-bench-")
+    port = _free_port()
+    server = _start_mocks(port)
+    _configure_env(port, workdir, args.store)
+
+    report = {"meta": {"git_rev": _git_rev(), "python": platform.python_version(), "store": args.store,
+                       "profile": default, "overrides": mocks.PROFILE, "args": vars(args), "workdir": workdir,
+                       "at": time.strftime("%Y-%m-%dT%H:%M:%S")}}
+    report.update(asyncio.run(_bench(args, workdir)))
+    report["upstreams"] = mocks.STATS
+    server.should_exit = True
+
+    _print(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
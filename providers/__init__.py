@@ -1,14 +1,22 @@
 # providers/__init__.py
+from typing import Dict
 
-from .changenow import cn_estimate, cn_create, cn_info
-from .exolix import ex_rate, ex_create, ex_info
-from .simpleswap import ss_estimate, ss_create, ss_info, _ss_map_net, _ss_params, SS_BASE
-from .stealthex import sx_estimate, sx_create, sx_info  # <-- import the symbols explicitly
+from .base import ProviderAdapter
+from .changenow import cn_estimate, cn_create, cn_info, cn_range, ChangeNowAdapter
+from .exolix import ex_rate, ex_create, ex_info, ex_range, ExolixAdapter
+from .simpleswap import ss_estimate, ss_create, ss_info, ss_range, _ss_map_net, _ss_params, SS_BASE, SimpleSwapAdapter
+from .stealthex import sx_estimate, sx_create, sx_info, sx_range, sx_cache_loop, sx_cache_info, StealthExAdapter  # <-- import the symbols explicitly
+
+# name -> adapter, in the order routes are tried/listed
+PROVIDERS: Dict[str, ProviderAdapter] = {
+    a.name: a for a in (ChangeNowAdapter(), ExolixAdapter(), SimpleSwapAdapter(), StealthExAdapter())
+}
 
 __all__ = [
-    "cn_estimate", "cn_create", "cn_info",
-    "ex_rate", "ex_create", "ex_info",
-    "ss_estimate", "ss_create", "ss_info",
+    "ProviderAdapter", "PROVIDERS",
+    "cn_estimate", "cn_create", "cn_info", "cn_range", "ChangeNowAdapter",
+    "ex_rate", "ex_create", "ex_info", "ex_range", "ExolixAdapter",
+    "ss_estimate", "ss_create", "ss_info", "ss_range", "SimpleSwapAdapter",
     "_ss_map_net", "_ss_params", "SS_BASE",
-    "sx_estimate", "sx_create", "sx_info",
+    "sx_estimate", "sx_create", "sx_info", "sx_range", "sx_cache_loop", "sx_cache_info", "StealthExAdapter",
 ]
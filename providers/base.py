@@ -0,0 +1,51 @@
+# providers/base.py
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+def transient_status(code: int) -> bool:
+    """5xx/429: the provider is failing or throttling us, which is not a 'no quote' answer."""
+    return code >= 500 or code == 429
+
+class ProviderAdapter(ABC):
+    """Uniform face of one exchange integration. app.py only talks to providers through this,
+    so concurrency limits, caching, timeouts and metrics live in one place there.
+
+    Amounts are in `frm` units, networks are the app's names (BTC/ETH/TRX/BSC/LTC, None for XMR)."""
+
+    name: str = ""
+    # what the integration can do; informational for routing/diagnostics
+    capabilities: Dict[str, bool] = {"float": True, "fixed": True, "refund_address": True, "limits": True}
+
+    @abstractmethod
+    async def estimate(self, frm: str, to: str, amount: float,
+                       net_from: Optional[str], net_to: Optional[str], rate_type: str) -> dict:
+        """{'toAmount': float, ...raw fields}; toAmount 0 means 'no quote'. Upstream failures
+        (see `transient_status`) raise instead, so health tracking counts them."""
+
+    @abstractmethod
+    async def create_raw(self, frm: str, to: str, amount: float, address: str,
+                         net_from: Optional[str], net_to: Optional[str], rate_type: str,
+                         refund_address: Optional[str]) -> dict:
+        ...
+
+    @abstractmethod
+    def normalize_order(self, raw: dict) -> dict:
+        ...
+
+    async def create(self, frm: str, to: str, amount: float, address: str,
+                     net_from: Optional[str], net_to: Optional[str], rate_type: str,
+                     refund_address: Optional[str] = None) -> dict:
+        """{'id', 'deposit_address', 'deposit_extra', 'raw'}"""
+        raw = await self.create_raw(frm, to, amount, address, net_from, net_to, rate_type, refund_address)
+        order = self.normalize_order(raw or {})
+        order["raw"] = raw
+        return order
+
+    @abstractmethod
+    async def info(self, tx_id: str) -> dict:
+        ...
+
+    @abstractmethod
+    async def limits(self, frm: str, net_from: Optional[str], to: str, net_to: Optional[str],
+                     rate_type: str) -> dict:
+        """{'min': float|None, 'max': float|None} in `frm` units."""
@@ -1,9 +1,12 @@
 # providers/changenow.py
 import os
 from typing import Optional
-import httpx
+from services.http_pool import http_client
+from fastapi import HTTPException
+from .base import ProviderAdapter, transient_status
 
 CN_KEY = os.getenv("CHANGENOW_API_KEY", "").strip()
+CN_BASE = os.getenv("CHANGENOW_BASE_URL", "https://api.changenow.io/v2").rstrip("/")
 
 def _cn_headers() -> dict:
     h = {"Accept": "application/json", "Content-Type": "application/json"}
@@ -19,6 +22,7 @@ async def cn_estimate(frm: str, to: str, amt: float,
         frm_net = None
     if to.lower() == "xmr":
         to_net = None
+    failed = []  # transient upstream statuses seen
 
     async def _estimated(amount: float, fnet, tnet):
         params = {
@@ -29,19 +33,20 @@ async def cn_estimate(frm: str, to: str, amt: float,
         }
         if fnet: params["fromNetwork"] = fnet.lower()
         if tnet: params["toNetwork"] = tnet.lower()
-        async with httpx.AsyncClient(timeout=15) as c:
-            r = await c.get("https://api.changenow.io/v2/exchange/estimated-amount",
-                            params=params, headers=h)
-            if r.status_code == 200:
-                j = r.json()
-                v = j.get("toAmount") or j.get("estimatedAmount")
-                try:
-                    n = float(v) if v not in (None, "") else 0.0
-                except Exception:
-                    n = 0.0
-                if n > 0:
-                    j["toAmount"] = n
-                    return j
+        r = await http_client("changenow").get(f"{CN_BASE}/exchange/estimated-amount",
+                                               params=params, headers=h)
+        if r.status_code == 200:
+            j = r.json()
+            v = j.get("toAmount") or j.get("estimatedAmount")
+            try:
+                n = float(v) if v not in (None, "") else 0.0
+            except Exception:
+                n = 0.0
+            if n > 0:
+                j["toAmount"] = n
+                return j
+        elif transient_status(r.status_code):
+            failed.append(r.status_code)
         return {"toAmount": 0.0}
 
     j = await _estimated(amt, None, None)
@@ -50,7 +55,10 @@ async def cn_estimate(frm: str, to: str, amt: float,
     j2 = await _estimated(amt, frm_net, to_net)
     if j2.get("toAmount", 0.0) > 0:
         return j2
-    return await _estimated(max(1e-12, amt * 0.999), frm_net, to_net)
+    j3 = await _estimated(max(1e-12, amt * 0.999), frm_net, to_net)
+    if j3.get("toAmount", 0.0) <= 0 and failed:
+        raise HTTPException(502, f"ChangeNOW estimate failed ({failed[-1]})")
+    return j3
 
 async def cn_create(frm: str, to: str, amt: float, payout_address: str,
                     frm_net: Optional[str] = None, to_net: Optional[str] = None,
@@ -70,15 +78,54 @@ async def cn_create(frm: str, to: str, amt: float, payout_address: str,
     if frm_net: body["fromNetwork"] = frm_net.lower()
     if to_net: body["toNetwork"] = to_net.lower()
     if refund_address: body["refundAddress"] = refund_address
-    async with httpx.AsyncClient(timeout=20) as c:
-        r = await c.post("https://api.changenow.io/v2/exchange", json=body, headers=h)
-        r.raise_for_status()
-        return r.json()
+    r = await http_client("changenow").post(f"{CN_BASE}/exchange", json=body, headers=h, timeout=20)
+    r.raise_for_status()
+    return r.json()
 
 async def cn_info(tx_id: str):
     h = _cn_headers()
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get("https://api.changenow.io/v2/exchange/by-id",
-                        params={"id": tx_id}, headers=h)
-        r.raise_for_status()
-        return r.json()
+    r = await http_client("changenow").get(f"{CN_BASE}/exchange/by-id",
+                                           params={"id": tx_id}, headers=h)
+    r.raise_for_status()
+    return r.json()
+
+async def cn_range(frm: str, to: str, frm_net: Optional[str] = None, to_net: Optional[str] = None,
+                   flow: str = "standard"):
+    """{'min': float|None, 'max': float|None} in `frm` units."""
+    if frm.lower() == "xmr":
+        frm_net = None
+    if to.lower() == "xmr":
+        to_net = None
+    params = {"fromCurrency": frm.lower(), "toCurrency": to.lower(), "flow": flow}
+    if frm_net: params["fromNetwork"] = frm_net.lower()
+    if to_net: params["toNetwork"] = to_net.lower()
+    r = await http_client("changenow").get(f"{CN_BASE}/exchange/range",
+                                           params=params, headers=_cn_headers())
+    r.raise_for_status()
+    j = r.json()
+    mn, mx = j.get("minAmount"), j.get("maxAmount")
+    return {"min": float(mn) if mn not in (None, "") else None, "max": float(mx) if mx not in (None, "") else None}
+
+# ---------------------- ADAPTER ----------------------
+def _cn_flow(rate_type: str) -> str:
+    return "fixed" if rate_type == "fixed" else "standard"
+
+class ChangeNowAdapter(ProviderAdapter):
+    name = "ChangeNOW"
+
+    async def estimate(self, frm, to, amount, net_from, net_to, rate_type):
+        return await cn_estimate(frm, to, amount, net_from, net_to, _cn_flow(rate_type))
+
+    async def create_raw(self, frm, to, amount, address, net_from, net_to, rate_type, refund_address):
+        return await cn_create(frm, to, amount, address, net_from, net_to, _cn_flow(rate_type), refund_address)
+
+    def normalize_order(self, raw):
+        return {"id": raw.get("id") or raw.get("exchangeId") or "",
+                "deposit_address": raw.get("payinAddress") or raw.get("payinAddressString") or "",
+                "deposit_extra": raw.get("payinExtraId") or None}
+
+    async def info(self, tx_id):
+        return await cn_info(tx_id)
+
+    async def limits(self, frm, net_from, to, net_to, rate_type):
+        return await cn_range(frm, to, net_from, net_to, _cn_flow(rate_type))
@@ -1,10 +1,12 @@
 # providers/exolix.py
 import os
 from typing import Optional
-import httpx
+from services.http_pool import http_client
+from .base import ProviderAdapter, transient_status
 from fastapi import HTTPException
 
 _EX_KEY = os.getenv("EXOLIX_API_KEY", "").strip()
+EX_BASE = os.getenv("EXOLIX_BASE_URL", "https://exolix.com/api/v2").rstrip("/")
 EX_AUTH = _EX_KEY if _EX_KEY.lower().startswith("bearer ") else (f"Bearer {_EX_KEY}" if _EX_KEY else "")
 
 def _ex_headers() -> dict:
@@ -26,16 +28,21 @@ async def ex_rate(frm: str, net_from: Optional[str], to: str, net_to: Optional[s
     p = {"coinFrom": frm, "coinTo": to, "amount": str(amt), "rateType": rate_type}
     if net_from: p["networkFrom"] = net_from
     if net_to: p["networkTo"] = net_to
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get("https://exolix.com/api/v2/rate", params=p, headers=_ex_headers())
-        if r.status_code == 200:
-            j = r.json()
-            if float(j.get("toAmount") or 0) > 0:
-                return j
-        # fallback without nets
-        p2 = {"coinFrom": frm, "coinTo": to, "amount": str(amt), "rateType": rate_type}
-        r2 = await c.get("https://exolix.com/api/v2/rate", params=p2, headers=_ex_headers())
-        return r2.json() if r2.status_code == 200 else {"toAmount": 0.0, "fromAmount": amt}
+    c = http_client("exolix")
+    r = await c.get(f"{EX_BASE}/rate", params=p, headers=_ex_headers())
+    if r.status_code == 200:
+        j = r.json()
+        if float(j.get("toAmount") or 0) > 0:
+            return j
+    # fallback without nets
+    p2 = {"coinFrom": frm, "coinTo": to, "amount": str(amt), "rateType": rate_type}
+    r2 = await c.get(f"{EX_BASE}/rate", params=p2, headers=_ex_headers())
+    if r2.status_code == 200:
+        return r2.json()
+    failed = [x for x in (r.status_code, r2.status_code) if transient_status(x)]
+    if failed:
+        raise HTTPException(502, f"Exolix rate failed ({failed[-1]})")
+    return {"toAmount": 0.0, "fromAmount": amt}
 
 async def ex_create(frm: str, net_from: Optional[str], to: str, net_to: Optional[str],
                     amt: float, withdrawal: str, rate_type: str = "float"):
@@ -47,17 +54,51 @@ async def ex_create(frm: str, net_from: Optional[str], to: str, net_to: Optional
         "amount": amt, "withdrawalAddress": withdrawal,
         "rateType": rate_type
     }
-    async with httpx.AsyncClient(timeout=20) as c:
-        r = await c.post("https://exolix.com/api/v2/transactions", json=b, headers=_ex_headers())
-        if r.status_code >= 400:
-            try:
-                raise HTTPException(502, f"Exolix create failed ({r.status_code}): {r.json()}")
-            except Exception:
-                raise HTTPException(502, f"Exolix create failed ({r.status_code}): {r.text}")
-        return r.json()
+    r = await http_client("exolix").post(f"{EX_BASE}/transactions", json=b, headers=_ex_headers(), timeout=20)
+    if r.status_code >= 400:
+        try:
+            raise HTTPException(502, f"Exolix create failed ({r.status_code}): {r.json()}")
+        except Exception:
+            raise HTTPException(502, f"Exolix create failed ({r.status_code}): {r.text}")
+    return r.json()
 
 async def ex_info(tx_id: str):
-    async with httpx.AsyncClient(timeout=15) as c:
-        r = await c.get(f"https://exolix.com/api/v2/transactions/{tx_id}", headers=_ex_headers())
-        r.raise_for_status()
-        return r.json()
+    r = await http_client("exolix").get(f"{EX_BASE}/transactions/{tx_id}", headers=_ex_headers())
+    r.raise_for_status()
+    return r.json()
+
+async def ex_range(frm: str, net_from: Optional[str], to: str, net_to: Optional[str], rate_type: str = "float"):
+    """{'min': float|None, 'max': float|None} in `frm` units. Exolix reports limits on every /rate
+    response, including the 4xx it returns for out-of-range amounts."""
+    p = {"coinFrom": frm, "coinTo": to, "amount": "1", "rateType": rate_type}
+    if net_from: p["networkFrom"] = net_from
+    if net_to: p["networkTo"] = net_to
+    r = await http_client("exolix").get(f"{EX_BASE}/rate", params=p, headers=_ex_headers())
+    j = r.json()
+    mn, mx = j.get("minAmount"), j.get("maxAmount")
+    if mn in (None, "") and mx in (None, ""):
+        raise HTTPException(502, f"Exolix limits unavailable ({r.status_code}): {j}")
+    return {"min": float(mn) if mn not in (None, "") else None, "max": float(mx) if mx not in (None, "") else None}
+
+# ---------------------- ADAPTER ----------------------
+class ExolixAdapter(ProviderAdapter):
+    name = "Exolix"
+    capabilities = {**ProviderAdapter.capabilities, "refund_address": False}
+
+    async def estimate(self, frm, to, amount, net_from, net_to, rate_type):
+        return await ex_rate(frm, net_from, to, net_to, amount, rate_type)
+
+    async def create_raw(self, frm, to, amount, address, net_from, net_to, rate_type, refund_address):
+        # XMR has no app network; Exolix wants "XMR" there (ex_create defaults a missing network to the coin)
+        return await ex_create(frm, net_from, to, net_to, amount, address, rate_type)
+
+    def normalize_order(self, raw):
+        return {"id": raw.get("id") or raw.get("transaction_id") or "",
+                "deposit_address": raw.get("depositAddress") or "",
+                "deposit_extra": raw.get("depositExtraId") or None}
+
+    async def info(self, tx_id):
+        return await ex_info(tx_id)
+
+    async def limits(self, frm, net_from, to, net_to, rate_type):
+        return await ex_range(frm, net_from, to, net_to, rate_type)
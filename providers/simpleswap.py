@@ -2,11 +2,13 @@
 import os
 from typing import Optional
 import httpx
+from services.http_pool import http_client
+from .base import ProviderAdapter, transient_status
 import contextlib
 from fastapi import HTTPException
 
 SS_KEY = os.getenv("SIMPLESWAP_API_KEY", "").strip()
-SS_BASE = "https://api.simpleswap.io/v1"
+SS_BASE = os.getenv("SIMPLESWAP_BASE_URL", "https://api.simpleswap.io/v1").rstrip("/")
 
 def _ss_params(base: dict) -> dict:
     p = dict(base)
@@ -67,18 +69,22 @@ async def ss_estimate(frm: str, to: str, amt: float,
         })
         if nf: params["network_from"] = nf
         if nt: params["network_to"] = nt
-        async with httpx.AsyncClient(timeout=12) as c:
-            r = await c.get(f"{SS_BASE}/get_estimated", params=params)
-            out = await _normalize_estimated(r)
-            out["_params"] = params
-            return out
+        r = await http_client("simpleswap").get(f"{SS_BASE}/get_estimated", params=params)
+        out = await _normalize_estimated(r)
+        out["_params"] = params
+        return out
 
     nf = _ss_map_net(frm, net_from)
     nt = _ss_map_net(to, net_to)
     j = await _call(nf, nt)
     if (j.get("toAmount") or 0) > 0:
         return j
-    return await _call(None, None)
+    j2 = await _call(None, None)
+    if (j2.get("toAmount") or 0) <= 0:
+        failed = [x["_status"] for x in (j, j2) if transient_status(x["_status"])]
+        if failed:
+            raise HTTPException(502, f"SimpleSwap estimate failed ({failed[-1]})")
+    return j2
 
 async def ss_create(frm: str, to: str, amt: float, payout_address: str,
                     net_from: Optional[str], net_to: Optional[str],
@@ -108,52 +114,52 @@ async def ss_create(frm: str, to: str, amt: float, payout_address: str,
         return j
 
     r1 = r2 = r3 = None
-    async with httpx.AsyncClient(timeout=30) as c:
-        # Try 1: POST query param
-        try:
-            url1 = httpx.URL(f"{SS_BASE}/create_exchange").copy_add_param("api_key", SS_KEY)
-            r1 = await c.post(url1, json=payload, headers={"Content-Type": "application/json"})
-            j1 = None
-            try: j1 = r1.json()
-            except Exception: pass
-            if r1.status_code == 200 and isinstance(j1, dict):
-                return await _normalize(j1)
-        except Exception:
-            pass
+    c = http_client("simpleswap")
+    # Try 1: POST query param
+    try:
+        url1 = httpx.URL(f"{SS_BASE}/create_exchange").copy_add_param("api_key", SS_KEY)
+        r1 = await c.post(url1, json=payload, headers={"Content-Type": "application/json"}, timeout=30)
+        j1 = None
+        try: j1 = r1.json()
+        except Exception: pass
+        if r1.status_code == 200 and isinstance(j1, dict):
+            return await _normalize(j1)
+    except Exception:
+        pass
 
-        # Try 2: POST header
-        try:
-            url2 = f"{SS_BASE}/create_exchange"
-            r2 = await c.post(url2, json=payload, headers={"Content-Type": "application/json", "X-Api-Key": SS_KEY})
-            j2 = None
-            try: j2 = r2.json()
-            except Exception: pass
-            if r2.status_code == 200 and isinstance(j2, dict):
-                return await _normalize(j2)
-        except Exception:
-            pass
+    # Try 2: POST header
+    try:
+        url2 = f"{SS_BASE}/create_exchange"
+        r2 = await c.post(url2, json=payload, headers={"Content-Type": "application/json", "X-Api-Key": SS_KEY}, timeout=30)
+        j2 = None
+        try: j2 = r2.json()
+        except Exception: pass
+        if r2.status_code == 200 and isinstance(j2, dict):
+            return await _normalize(j2)
+    except Exception:
+        pass
 
-        # Try 3: legacy GET
-        try:
-            params = {
-                "currency_from": payload["currency_from"],
-                "currency_to": payload["currency_to"],
-                "amount": payload["amount"],
-                "address_to": payload["address_to"],
-                "fixed": payload["fixed"],
-                "api_key": SS_KEY,
-            }
-            if nf: params["network_from"] = nf
-            if nt: params["network_to"] = nt
-            if refund_address: params["refund_address"] = refund_address
-            r3 = await c.get(f"{SS_BASE}/get_exchange", params=params)
-            j3 = None
-            try: j3 = r3.json()
-            except Exception: pass
-            if r3.status_code == 200 and isinstance(j3, dict):
-                return await _normalize(j3)
-        except Exception:
-            pass
+    # Try 3: legacy GET
+    try:
+        params = {
+            "currency_from": payload["currency_from"],
+            "currency_to": payload["currency_to"],
+            "amount": payload["amount"],
+            "address_to": payload["address_to"],
+            "fixed": payload["fixed"],
+            "api_key": SS_KEY,
+        }
+        if nf: params["network_from"] = nf
+        if nt: params["network_to"] = nt
+        if refund_address: params["refund_address"] = refund_address
+        r3 = await c.get(f"{SS_BASE}/get_exchange", params=params, timeout=30)
+        j3 = None
+        try: j3 = r3.json()
+        except Exception: pass
+        if r3.status_code == 200 and isinstance(j3, dict):
+            return await _normalize(j3)
+    except Exception:
+        pass
 
     # Prefer the most informative failure
     if r2 is not None:
@@ -166,7 +172,41 @@ async def ss_create(frm: str, to: str, amt: float, payout_address: str,
 
 async def ss_info(exchange_id: str):
     params = _ss_params({"id": exchange_id})
-    async with httpx.AsyncClient(timeout=12) as c:
-        r = await c.get(f"{SS_BASE}/get_exchange", params=params)
-        r.raise_for_status()
-        return r.json()
+    r = await http_client("simpleswap").get(f"{SS_BASE}/get_exchange", params=params)
+    r.raise_for_status()
+    return r.json()
+
+async def ss_range(frm: str, to: str, net_from: Optional[str], net_to: Optional[str], rate_type: str):
+    """{'min': float|None, 'max': None} in `frm` units (SimpleSwap `get_min`)."""
+    params = _ss_params({"currency_from": frm.lower(), "currency_to": to.lower(), "fixed": _ss_fixed(rate_type)})
+    nf = _ss_map_net(frm, net_from)
+    nt = _ss_map_net(to, net_to)
+    if nf: params["network_from"] = nf
+    if nt: params["network_to"] = nt
+    r = await http_client("simpleswap").get(f"{SS_BASE}/get_min", params=params)
+    r.raise_for_status()
+    j = r.json()
+    if isinstance(j, dict):
+        j = j.get("min") or j.get("min_amount")
+    return {"min": float(j) if j not in (None, "") else None, "max": None}
+
+# ---------------------- ADAPTER ----------------------
+class SimpleSwapAdapter(ProviderAdapter):
+    name = "SimpleSwap"
+
+    async def estimate(self, frm, to, amount, net_from, net_to, rate_type):
+        return await ss_estimate(frm, to, amount, net_from, net_to, rate_type)
+
+    async def create_raw(self, frm, to, amount, address, net_from, net_to, rate_type, refund_address):
+        return await ss_create(frm, to, amount, address, net_from, net_to, rate_type, refund_address)
+
+    def normalize_order(self, raw):
+        return {"id": raw.get("id") or "",
+                "deposit_address": raw.get("deposit") or "",
+                "deposit_extra": raw.get("extra_id") or None}
+
+    async def info(self, tx_id):
+        return await ss_info(tx_id)
+
+    async def limits(self, frm, net_from, to, net_to, rate_type):
+        return await ss_range(frm, to, net_from, net_to, rate_type)
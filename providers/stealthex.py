@@ -1,9 +1,12 @@
 # providers/stealthex.py
-import os
-import httpx
+import os, json, time, asyncio
+from typing import Dict, List, Optional, Tuple
+from services.http_pool import http_client
+from services.prices import PRICES
+from .base import ProviderAdapter, transient_status
 from fastapi import HTTPException
 
-SX_BASE = "https://api.stealthex.io/v4"
+SX_BASE = os.getenv("STEALTHEX_BASE_URL", "https://api.stealthex.io/v4").rstrip("/")
 SX_KEY = os.getenv("STEALTHEX_API_KEY", "").strip()
 
 def _headers():
@@ -13,31 +16,14 @@ def _headers():
         h["Content-Type"] = "application/json"
     return h
 
-# -------- CoinGecko fallback for toAmount (only used when StealthEX can't quote) --------
-_CG_IDS = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
-    "USDT": "tether",
-    "USDC": "usd-coin",
-    "LTC": "litecoin",
-    "XMR": "monero",
-}
+# -------- CoinGecko-based toAmount (StealthEX has no side-effect-free quote) --------
 _HAIRCUT = float(os.getenv("STEALTHEX_QUOTE_HAIRCUT", "0.93"))
 
 async def _cg_prices(symbols):
-    ids = ",".join(_CG_IDS[s] for s in symbols if s in _CG_IDS)
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    try:
-        async with httpx.AsyncClient(timeout=10) as c:
-            r = await c.get(url, params={"ids": ids, "vs_currencies": "usd"})
-            r.raise_for_status()
-            data = r.json()
-        out = {}
-        for s in symbols:
-            out[s] = float(data.get(_CG_IDS[s], {}).get("usd", 0) or 0)
-        return out
-    except Exception:
-        return {"BTC":60000,"ETH":3000,"USDT":1.0,"USDC":1.0,"LTC":70,"XMR":160}
+    # shared background-refreshed oracle; stale prices give no quote rather than a wrong one
+    if PRICES.is_stale():
+        return {}
+    return {s: PRICES.price(s) for s in symbols}
 
 def _candidates_for(symbol: str, app_net: str | None):
     """Return a list of StealthEX network name candidates in priority order."""
@@ -70,27 +56,138 @@ async def _sx_range(sym_from: str, net_from: str, sym_to: str, net_to: str, rate
         "estimation": "direct",
         "rate": "floating" if (rate_type or "").lower() != "fixed" else "fixed",
     }
-    async with httpx.AsyncClient(timeout=10) as c:
-        r = await c.post(f"{SX_BASE}/rates/range", json=body, headers=_headers())
-        try:
-            j = r.json()
-        except Exception:
-            j = {"_text": r.text}
+    r = await http_client("stealthex").post(f"{SX_BASE}/rates/range", json=body, headers=_headers(), timeout=10)
+    try:
+        j = r.json()
+    except Exception:
+        j = {"_text": r.text}
     return r.status_code, j
 
-async def _find_working_nets(sym_from: str, app_net_from: str | None,
-                             sym_to: str, app_net_to: str | None,
-                             rate_type: str):
-    """Try combinations until /rates/range accepts the pair. Return (net_from, net_to, range_json) or (None, None, last_json)."""
-    last = None
+_SX_UNSUPPORTED = {400, 404, 422}  # /rates/range answers that mean "no such pair/network"
+
+async def _discover_nets(sym_from: str, app_net_from: str | None,
+                         sym_to: str, app_net_to: str | None,
+                         rate_type: str):
+    """Try combinations until /rates/range accepts the pair. Return (net_from, net_to, range_json) or
+    (None, None, last_json) when every combination was definitely rejected. Raises when any of them
+    failed for another reason (5xx, 429, auth, transport): that says nothing about the pair."""
+    last, failed = None, None
     for nf in _candidates_for(sym_from, app_net_from):
         for nt in _candidates_for(sym_to, app_net_to):
             status, rng = await _sx_range(sym_from, nf, sym_to, nt, rate_type)
             if status < 400 and not (isinstance(rng, dict) and rng.get("err")):
                 return nf, nt, rng
+            if status not in _SX_UNSUPPORTED or transient_status(status):
+                failed = status
             last = rng
+    if failed is not None:
+        raise HTTPException(502, f"StealthEX range check failed ({failed}): {sym_from}({app_net_from}) -> {sym_to}({app_net_to})")
     return None, None, last
 
+# -------- working-network + range cache (persisted, warmed at startup, refreshed in background) --------
+SX_NET_CACHE_TTL_S = float(os.getenv("STEALTHEX_NET_CACHE_TTL_S", "3600"))
+SX_NET_CACHE_NEG_TTL_S = float(os.getenv("STEALTHEX_NET_CACHE_NEG_TTL_S", "600"))  # unsupported pairs
+SX_CACHE_PATH = os.getenv("STEALTHEX_CACHE_PATH",
+                          os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "stealthex_cache.json"))
+_NET_CACHE: Dict[str, dict] = {}
+_NET_INFLIGHT: Dict[str, asyncio.Task] = {}
+
+def _net_key(sym_from: str, app_net_from: str | None, sym_to: str, app_net_to: str | None, rate_type: str) -> str:
+    rt = "fixed" if (rate_type or "").lower() == "fixed" else "float"
+    return "|".join([(sym_from or "").upper(), (app_net_from or "").upper(), (sym_to or "").upper(), (app_net_to or "").upper(), rt])
+
+def _entry_fresh(e: dict, now: float, slack: float = 1.0) -> bool:
+    ttl = SX_NET_CACHE_TTL_S if e.get("nf") else SX_NET_CACHE_NEG_TTL_S
+    return now - float(e.get("ts") or 0) < ttl * slack
+
+def _load_net_cache():
+    try:
+        with open(SX_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            _NET_CACHE.update(data)
+    except Exception:
+        pass
+
+def _save_net_cache():
+    try:
+        tmp = SX_CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_NET_CACHE, f)
+        os.replace(tmp, SX_CACHE_PATH)
+    except Exception:
+        pass
+
+async def _discover_and_store(key: str, sym_from: str, app_net_from: str | None,
+                              sym_to: str, app_net_to: str | None, rate_type: str) -> dict:
+    try:
+        nf, nt, rng = await _discover_nets(sym_from, app_net_from, sym_to, app_net_to, rate_type)
+        e = {"ts": time.time(), "nf": nf, "nt": nt, "range": rng if nf else None}
+        _NET_CACHE[key] = e
+        _save_net_cache()
+        return e
+    finally:
+        _NET_INFLIGHT.pop(key, None)
+
+async def _refresh_nets(key: str, sym_from: str, app_net_from: str | None,
+                        sym_to: str, app_net_to: str | None, rate_type: str) -> dict:
+    task = _NET_INFLIGHT.get(key)
+    if task is None:
+        # its own task: a quote hitting its deadline must not fail a create waiting on the same discovery
+        task = _NET_INFLIGHT[key] = asyncio.ensure_future(
+            _discover_and_store(key, sym_from, app_net_from, sym_to, app_net_to, rate_type))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(task)
+
+async def _find_working_nets(sym_from: str, app_net_from: str | None,
+                             sym_to: str, app_net_to: str | None,
+                             rate_type: str):
+    """Cached discovery. Return (net_from, net_to, range_json) or (None, None, None)."""
+    key = _net_key(sym_from, app_net_from, sym_to, app_net_to, rate_type)
+    e = _NET_CACHE.get(key)
+    if e is None or not _entry_fresh(e, time.time()):
+        try:
+            e = await _refresh_nets(key, sym_from, app_net_from, sym_to, app_net_to, rate_type)
+        except Exception:
+            if e is None or not e.get("nf"):
+                raise
+            # upstream hiccup: a stale working route beats none; failures are never cached
+    return e.get("nf"), e.get("nt"), e.get("range")
+
+async def sx_warm_cache(legs: List[Tuple[str, Optional[str]]], rate_types=("float", "fixed"), only_stale: bool = True):
+    """Discover asset<->XMR routes for every (asset, app network) leg; refreshes entries past half their TTL."""
+    sem = asyncio.Semaphore(4)
+    now = time.time()
+
+    async def _one(args):
+        key = _net_key(*args)
+        e = _NET_CACHE.get(key)
+        if only_stale and e is not None and _entry_fresh(e, now, slack=0.5):
+            return
+        async with sem:
+            try:
+                await _refresh_nets(key, *args)
+            except Exception:
+                pass
+
+    jobs = []
+    for asset, net in legs:
+        for rt in rate_types:
+            jobs.append((asset, net, "XMR", None, rt))
+            jobs.append(("XMR", None, asset, net, rt))
+    await asyncio.gather(*(_one(j) for j in jobs))
+
+async def sx_cache_loop(legs: List[Tuple[str, Optional[str]]]):
+    _load_net_cache()
+    while True:
+        await sx_warm_cache(legs)
+        await asyncio.sleep(max(30.0, min(SX_NET_CACHE_TTL_S, SX_NET_CACHE_NEG_TTL_S) / 2))
+
+def sx_cache_info() -> dict:
+    now = time.time()
+    return {"entries": len(_NET_CACHE), "supported": sum(1 for e in _NET_CACHE.values() if e.get("nf")),
+            "fresh": sum(1 for e in _NET_CACHE.values() if _entry_fresh(e, now)), "ttl_s": SX_NET_CACHE_TTL_S}
+
 # ---------------------- ESTIMATE ----------------------
 async def sx_estimate(asset_from: str, asset_to: str, amount_from: float,
                       net_from: str | None, net_to: str | None, rate_type: str):
@@ -99,7 +196,7 @@ async def sx_estimate(asset_from: str, asset_to: str, amount_from: float,
     if amount_from <= 0:
         return {"toAmount": 0.0}
 
-    # 1) Confirm pair & min via /rates/range with network-mapping
+    # 1) Confirm pair & min via /rates/range with network-mapping (cached)
     nf, nt, rng = await _find_working_nets(af, net_from, at, net_to, rate_type)
     if not nf or not nt:
         # Pair not supported -> hide in quotes
@@ -147,12 +244,11 @@ async def sx_create(asset_from: str, asset_to: str, amount_from: float,
     # if refund_address:
     #     body["refund_address"] = refund_address
 
-    async with httpx.AsyncClient(timeout=30) as c:
-        r = await c.post(f"{SX_BASE}/exchanges", json=body, headers=_headers())
-        try:
-            j = r.json()
-        except Exception:
-            j = {"_text": r.text}
+    r = await http_client("stealthex").post(f"{SX_BASE}/exchanges", json=body, headers=_headers(), timeout=30)
+    try:
+        j = r.json()
+    except Exception:
+        j = {"_text": r.text}
 
     if r.status_code >= 400 or (isinstance(j, dict) and j.get("err")):
         raise HTTPException(502, f"StealthEX create error {r.status_code}: {j}")
@@ -167,12 +263,42 @@ async def sx_create(asset_from: str, asset_to: str, amount_from: float,
 
 # ---------------------- INFO ----------------------
 async def sx_info(exchange_id: str):
-    async with httpx.AsyncClient(timeout=20) as c:
-        r = await c.get(f"{SX_BASE}/exchanges/{exchange_id}", headers=_headers())
-        try:
-            j = r.json()
-        except Exception:
-            j = {"_text": r.text}
+    r = await http_client("stealthex").get(f"{SX_BASE}/exchanges/{exchange_id}", headers=_headers())
+    try:
+        j = r.json()
+    except Exception:
+        j = {"_text": r.text}
     if r.status_code >= 400 or (isinstance(j, dict) and j.get("err")):
         raise HTTPException(502, f"StealthEX info error {r.status_code}: {j}")
     return j
+
+# ---------------------- RANGE ----------------------
+async def sx_range(asset_from: str, asset_to: str, net_from: str | None, net_to: str | None, rate_type: str):
+    """{'min': float|None, 'max': float|None} in `asset_from` units, from the cached /rates/range."""
+    nf, nt, rng = await _find_working_nets((asset_from or "").upper(), net_from, (asset_to or "").upper(), net_to, rate_type)
+    if not nf or not isinstance(rng, dict):
+        raise HTTPException(502, f"StealthEX range unavailable: {asset_from}({net_from}) -> {asset_to}({net_to})")
+    mn, mx = rng.get("min_amount"), rng.get("max_amount")
+    return {"min": float(mn) if mn not in (None, "") else None, "max": float(mx) if mx not in (None, "") else None}
+
+# ---------------------- ADAPTER ----------------------
+class StealthExAdapter(ProviderAdapter):
+    name = "StealthEX"
+    capabilities = {**ProviderAdapter.capabilities, "refund_address": False}  # refund_address not sent yet
+
+    async def estimate(self, frm, to, amount, net_from, net_to, rate_type):
+        return await sx_estimate(frm, to, amount, net_from, net_to, rate_type)
+
+    async def create_raw(self, frm, to, amount, address, net_from, net_to, rate_type, refund_address):
+        return await sx_create(frm, to, amount, address, net_from, net_to, rate_type, refund_address)
+
+    def normalize_order(self, raw):
+        return {"id": raw.get("id") or "",
+                "deposit_address": raw.get("depositAddress") or "",
+                "deposit_extra": raw.get("depositExtraId") or None}
+
+    async def info(self, tx_id):
+        return await sx_info(tx_id)
+
+    async def limits(self, frm, net_from, to, net_to, rate_type):
+        return await sx_range(frm, to, net_from, net_to, rate_type)
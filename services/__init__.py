@@ -0,0 +1,30 @@
+# services/__init__.py
+
+from .http_pool import http_client, open_http_clients, close_http_clients, http_pool_info
+from .quote_cache import QuoteCache, amount_bucket
+from .swap_store import JournalSwapStore, SqliteSwapStore
+from .wallet_index import IncomingTransferIndex
+from .events import EventHub
+from .prices import PriceOracle, PRICES
+from .limits import LimitsTable
+from .health import ProviderHealth, CircuitOpen
+from .hedge import HedgeBudget, hedged
+from .lease import SqliteLease
+from .payouts import PayoutBatcher
+from .jobs import WorkQueue
+from .subaddr_pool import SubaddressPool
+from .wallet_ledger import WalletLedger
+from .metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, timed_lock
+
+__all__ = [
+    "http_client", "open_http_clients", "close_http_clients", "http_pool_info",
+    "QuoteCache", "amount_bucket",
+    "JournalSwapStore", "SqliteSwapStore",
+    "IncomingTransferIndex", "EventHub",
+    "PriceOracle", "PRICES",
+    "LimitsTable",
+    "ProviderHealth", "CircuitOpen",
+    "HedgeBudget", "hedged",
+    "REGISTRY", "METRICS_CONTENT_TYPE", "timed_lock",
+    "SqliteLease", "PayoutBatcher", "WorkQueue", "SubaddressPool", "WalletLedger",
+]
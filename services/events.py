@@ -0,0 +1,46 @@
+# services/events.py
+import asyncio, os
+from typing import Dict, Set
+
+EVENT_QUEUE_MAX = int(os.getenv("EVENT_QUEUE_MAX", "100"))
+
+class EventHub:
+    """In-process pub/sub keyed by topic (swap id). Publishing never blocks: a subscriber that
+    falls behind loses its oldest events rather than slowing the sweeper."""
+
+    def __init__(self, queue_max: int = EVENT_QUEUE_MAX):
+        self.queue_max = queue_max
+        self._subs: Dict[str, Set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_max)
+        self._subs.setdefault(topic, set()).add(q)
+        return q
+
+    def unsubscribe(self, topic: str, q: asyncio.Queue):
+        subs = self._subs.get(topic)
+        if subs is None:
+            return
+        subs.discard(q)
+        if not subs:
+            self._subs.pop(topic, None)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self._subs.get(topic))
+
+    def publish(self, topic: str, event: dict):
+        for q in list(self._subs.get(topic, ())):
+            if q.full():
+                try:
+                    q.get_nowait()
+                    self.dropped += 1
+                except asyncio.QueueEmpty:
+                    pass
+            q.put_nowait(event)
+        self.published += 1
+
+    def stats(self) -> dict:
+        return {"topics": len(self._subs), "subscribers": sum(len(v) for v in self._subs.values()),
+                "published": self.published, "dropped": self.dropped}
@@ -0,0 +1,129 @@
+# services/health.py
+import os, time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+HEALTH_WINDOW_S = float(os.getenv("HEALTH_WINDOW_S", "300"))       # rolling window for error rate / latency
+HEALTH_MAX_SAMPLES = int(os.getenv("HEALTH_MAX_SAMPLES", "500"))   # per provider
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))       # no tripping on fewer calls than this
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_CONSECUTIVE = int(os.getenv("BREAKER_CONSECUTIVE", "5"))   # trips regardless of the rate
+BREAKER_COOLOFF_S = float(os.getenv("BREAKER_COOLOFF_S", "30"))
+BREAKER_COOLOFF_MAX_S = float(os.getenv("BREAKER_COOLOFF_MAX_S", "300"))  # cool-off doubles per failed probe
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+def _pct(sorted_vals, q: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+class _Breaker:
+    def __init__(self):
+        self.samples: Deque[Tuple[float, str, bool, float]] = deque(maxlen=HEALTH_MAX_SAMPLES)  # (ts, op, ok, latency)
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.cooloff_s = BREAKER_COOLOFF_S
+        self.consecutive = 0
+        self.probing = 0  # token of the half-open probe in flight, 0 when none
+        self.probes = 0
+        self.trips = 0
+        self.rejected = 0
+
+class ProviderHealth:
+    """Rolling per-provider error rate and latency, plus a circuit breaker.
+
+    closed -> open when the window's error rate (>= BREAKER_MIN_CALLS calls) or the run of
+    consecutive failures crosses its threshold; open -> half_open after the cool-off, where a
+    single probe call is let through; the probe closes the breaker or re-opens it for longer."""
+
+    def __init__(self):
+        self._b: Dict[str, _Breaker] = {}
+
+    def _get(self, provider: str) -> _Breaker:
+        b = self._b.get(provider)
+        if b is None:
+            b = self._b[provider] = _Breaker()
+        return b
+
+    def _window(self, b: _Breaker, op: Optional[str] = None):
+        cutoff = time.time() - HEALTH_WINDOW_S
+        while b.samples and b.samples[0][0] < cutoff:
+            b.samples.popleft()
+        return [s for s in b.samples if op is None or s[1] == op]
+
+    def state(self, provider: str) -> str:
+        b = self._get(provider)
+        if b.state == "open" and time.time() - b.opened_at >= b.cooloff_s:
+            b.state = "half_open"
+        return b.state
+
+    def available(self, provider: str) -> bool:
+        """Cheap pre-check for routing: False while open, or half-open with the probe taken."""
+        st = self.state(provider)
+        return st == "closed" or (st == "half_open" and not self._get(provider).probing)
+
+    def acquire(self, provider: str) -> Optional[int]:
+        """Call before a guarded request. None means rejected; otherwise a token to hand back to
+        record/release: 0 for an ordinary call, the probe's own token in half-open."""
+        st = self.state(provider)
+        b = self._get(provider)
+        if st == "closed":
+            return 0
+        if st == "half_open" and not b.probing:
+            b.probes += 1
+            b.probing = b.probes
+            return b.probing
+        b.rejected += 1
+        return None
+
+    def release(self, provider: str, token: int = 0):
+        """The call was abandoned (e.g. cancelled by a deadline) without an outcome."""
+        b = self._get(provider)
+        if token and b.probing == token:
+            b.probing = 0
+
+    def record(self, provider: str, op: str, ok: bool, latency_s: float, token: int = 0):
+        b = self._get(provider)
+        now = time.time()
+        b.samples.append((now, op, ok, latency_s))
+        b.consecutive = 0 if ok else b.consecutive + 1
+        if token and b.probing == token:
+            b.probing = 0
+            if ok:
+                b.state, b.cooloff_s = "closed", BREAKER_COOLOFF_S
+                b.samples.clear()  # start the new closed period from a clean window
+                b.samples.append((now, op, ok, latency_s))
+            else:
+                b.state, b.opened_at = "open", now
+                b.cooloff_s = min(BREAKER_COOLOFF_MAX_S, b.cooloff_s * 2)
+            return
+        if ok or b.state != "closed":
+            return
+        win = self._window(b)
+        errors = sum(1 for s in win if not s[2])
+        if b.consecutive >= BREAKER_CONSECUTIVE or (
+                len(win) >= BREAKER_MIN_CALLS and errors / len(win) >= BREAKER_ERROR_RATE):
+            b.state, b.opened_at, b.cooloff_s = "open", now, BREAKER_COOLOFF_S
+            b.trips += 1
+
+    def latency(self, provider: str, q: float, op: Optional[str] = None) -> Optional[float]:
+        return _pct(sorted(s[3] for s in self._window(self._get(provider), op) if s[2]), q)
+
+    def stats(self, provider: Optional[str] = None) -> dict:
+        if provider is None:
+            return {p: self.stats(p) for p in self._b}
+        b = self._get(provider)
+        win = self._window(b)
+        lat = sorted(s[3] for s in win if s[2])
+        r = lambda v: None if v is None else round(v, 3)
+        return {
+            "state": self.state(provider),
+            "calls": len(win),
+            "error_rate": round(sum(1 for s in win if not s[2]) / len(win), 3) if win else 0.0,
+            "p50_s": r(_pct(lat, 0.5)), "p90_s": r(_pct(lat, 0.9)), "p99_s": r(_pct(lat, 0.99)),
+            "consecutive_failures": b.consecutive,
+            "trips": b.trips, "rejected": b.rejected,
+            "retry_in_s": round(max(0.0, b.opened_at + b.cooloff_s - time.time()), 1) if b.state == "open" else None,
+        }
@@ -0,0 +1,70 @@
+# services/hedge.py
+import asyncio, os
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.05"))  # hedges per primary call, long-run
+HEDGE_BURST = float(os.getenv("HEDGE_BURST", "5"))             # hedges allowed back-to-back
+
+T = TypeVar("T")
+
+class HedgeBudget:
+    """Token bucket per key: every primary call earns `ratio` tokens (up to `burst`), a hedge
+    spends one, so hedges never exceed roughly `ratio` of traffic even when an upstream is slow."""
+
+    def __init__(self, ratio: float = HEDGE_MAX_RATIO, burst: float = HEDGE_BURST):
+        self.ratio, self.burst = ratio, burst
+        self._tokens: Dict[str, float] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _st(self, key: str) -> Dict[str, int]:
+        st = self._stats.get(key)
+        if st is None:
+            st = self._stats[key] = {"calls": 0, "hedged": 0, "hedge_won": 0, "denied": 0}
+        return st
+
+    def on_call(self, key: str):
+        self._st(key)["calls"] += 1
+        self._tokens[key] = min(self.burst, self._tokens.get(key, self.burst) + self.ratio)
+
+    def try_spend(self, key: str) -> bool:
+        if self._tokens.get(key, self.burst) >= 1.0:
+            self._tokens[key] = self._tokens.get(key, self.burst) - 1.0
+            self._st(key)["hedged"] += 1
+            return True
+        self._st(key)["denied"] += 1
+        return False
+
+    def on_hedge_won(self, key: str):
+        self._st(key)["hedge_won"] += 1
+
+    def stats(self) -> dict:
+        return {"max_ratio": self.ratio, "burst": self.burst,
+                "keys": {k: dict(v, tokens=round(self._tokens.get(k, self.burst), 2)) for k, v in self._stats.items()}}
+
+async def hedged(key: str, call: Callable[[], Awaitable[T]], delay_s: Optional[float], budget: HedgeBudget) -> T:
+    """Run `call()`; if it has not finished after `delay_s` (and the budget allows) start a second
+    identical call and return whichever succeeds first. The loser is cancelled."""
+    budget.on_call(key)
+    first = asyncio.ensure_future(call())
+    if delay_s is None:
+        return await first
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay_s)
+        if done or not budget.try_spend(key):
+            return await first
+        second = asyncio.ensure_future(call())
+        tasks.add(second)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    if t is second:
+                        budget.on_hedge_won(key)
+                    return t.result()
+        return await first  # both failed: surface the primary's error
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
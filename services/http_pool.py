@@ -0,0 +1,77 @@
+# services/http_pool.py
+import os
+from typing import Dict, Optional
+import httpx
+
+try:  # HTTP/2 needs the optional `h2` package (httpx[http2])
+    import h2  # noqa: F401
+    _H2_AVAILABLE = True
+except Exception:
+    _H2_AVAILABLE = False
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "") or default)
+    except Exception:
+        return default
+
+# name -> defaults. Timeouts mirror what each integration used per call before pooling.
+# Override per client with HTTP_TIMEOUT_<NAME>, HTTP_MAX_CONN_<NAME>, HTTP_MAX_KEEPALIVE_<NAME>.
+_PROFILES: Dict[str, dict] = {
+    "changenow":  {"timeout": 15, "http2": True},
+    "exolix":     {"timeout": 15, "http2": True},
+    "simpleswap": {"timeout": 12, "http2": True},
+    "stealthex":  {"timeout": 20, "http2": True},
+    "coingecko":  {"timeout": 15, "http2": True},
+    "wallet":     {"timeout": 45, "http2": False, "max_connections": 4},  # monero-wallet-rpc is single-threaded
+}
+
+HTTP_MAX_CONNECTIONS = int(_env_float("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE = int(_env_float("HTTP_MAX_KEEPALIVE", 10))
+HTTP_KEEPALIVE_EXPIRY_S = _env_float("HTTP_KEEPALIVE_EXPIRY_S", 60)
+HTTP_CONNECT_TIMEOUT_S = _env_float("HTTP_CONNECT_TIMEOUT_S", 5)
+
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+def _build(name: str) -> httpx.AsyncClient:
+    prof = _PROFILES.get(name, {})
+    key = name.upper()
+    timeout = _env_float(f"HTTP_TIMEOUT_{key}", prof.get("timeout", 15))
+    limits = httpx.Limits(
+        max_connections=int(_env_float(f"HTTP_MAX_CONN_{key}", prof.get("max_connections", HTTP_MAX_CONNECTIONS))),
+        max_keepalive_connections=int(_env_float(f"HTTP_MAX_KEEPALIVE_{key}", prof.get("max_keepalive", HTTP_MAX_KEEPALIVE))),
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=min(timeout, HTTP_CONNECT_TIMEOUT_S)),
+        limits=limits,
+        http2=bool(prof.get("http2")) and _H2_AVAILABLE,
+    )
+
+def http_client(name: str) -> httpx.AsyncClient:
+    """Process-wide pooled client for one upstream (keep-alive, per-host pool).
+    Do not close it at call sites; `close_http_clients()` runs on app shutdown."""
+    c = _CLIENTS.get(name)
+    if c is None or c.is_closed:
+        c = _CLIENTS[name] = _build(name)
+    return c
+
+def open_http_clients(names: Optional[list] = None):
+    for n in (names or list(_PROFILES.keys())):
+        http_client(n)
+
+async def close_http_clients():
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for c in clients:
+        try:
+            await c.aclose()
+        except Exception:
+            pass
+
+def http_pool_info() -> Dict[str, dict]:
+    out = {}
+    for n, c in _CLIENTS.items():
+        out[n] = {"closed": c.is_closed, "http2": bool(_PROFILES.get(n, {}).get("http2")) and _H2_AVAILABLE,
+                  "timeout": c.timeout.read}
+    return out
@@ -0,0 +1,83 @@
+# services/jobs.py
+import asyncio, os
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+LEG2_WORKERS = int(os.getenv("LEG2_WORKERS", "4"))
+
+class WorkQueue:
+    """Deduplicating in-memory queue of ids with delayed re-enqueue and a fixed worker pool.
+
+    The queue itself is not durable: callers keep job state on their own records and
+    re-enqueue whatever is unfinished after a restart."""
+
+    def __init__(self, handler: Callable[[str], Awaitable[Optional[float]]], workers: int = LEG2_WORKERS):
+        # handler(id) -> None when done, or seconds until it should run again
+        self._handler = handler
+        self.workers = max(1, workers)
+        self._q: "asyncio.Queue[str]" = asyncio.Queue()
+        self._queued: Set[str] = set()
+        self._delayed: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks = []
+        self.running = 0
+        self.processed = 0
+        self.errors = 0
+
+    def enqueue(self, job_id: str, delay_s: float = 0.0):
+        if job_id in self._queued:
+            return
+        if delay_s > 0:
+            if job_id not in self._delayed:
+                self._delayed[job_id] = asyncio.get_running_loop().call_later(delay_s, self._release, job_id)
+            return
+        self._queued.add(job_id)
+        self._q.put_nowait(job_id)
+
+    def _release(self, job_id: str):
+        self._delayed.pop(job_id, None)
+        self.enqueue(job_id)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._queued or job_id in self._delayed
+
+    async def _worker(self):
+        while True:
+            q = self._q  # stop() swaps in a fresh queue; account for this id on the one it came from
+            job_id = await q.get()
+            self.running += 1
+            try:
+                again = await self._handler(job_id)
+            except Exception:
+                self.errors += 1
+                again = None
+            finally:
+                self.running -= 1
+                self._queued.discard(job_id)
+                q.task_done()
+            self.processed += 1
+            if again is not None:
+                self.enqueue(job_id, again)
+
+    async def join(self):
+        """Wait until every id queued so far has been handled (delayed ones are not waited for)."""
+        await self._q.join()
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        for t in self._tasks:
+            t.cancel()
+        self._tasks = []
+        for h in self._delayed.values():
+            h.cancel()
+        self._delayed.clear()
+        self._queued.clear()
+        old, self._q = self._q, asyncio.Queue()
+        while not old.empty():
+            old.get_nowait()
+            old.task_done()  # releases join() waiters on the dropped queue
+
+    def stats(self) -> dict:
+        return {"workers": len(self._tasks), "queued": self._q.qsize(), "delayed": len(self._delayed),
+                "running": self.running, "processed": self.processed, "errors": self.errors}
@@ -0,0 +1,96 @@
+# services/lease.py
+import contextlib, os, socket, sqlite3, time, uuid
+from typing import Optional
+
+LEASE_TTL_S = float(os.getenv("LEASE_TTL_S", "15"))
+
+_SQL = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    acquired_at REAL NOT NULL
+);
+"""
+
+def default_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class SqliteLease:
+    """Named lease in a SQLite table shared by every worker using the same database file.
+
+    `try_acquire()` takes the lease if it is free or expired, or renews it if we hold it; call it
+    every TTL/3. `held()` is checked locally and turns False `margin_s` before our last known
+    expiry, so a worker that cannot renew (stalled loop, locked db) stops acting before anyone
+    else can take over."""
+
+    def __init__(self, db_path: str, name: str, holder: Optional[str] = None,
+                 ttl_s: float = LEASE_TTL_S, margin_s: Optional[float] = None):
+        self.name = name
+        self.holder = holder or default_holder_id()
+        self.ttl_s = ttl_s
+        self.margin_s = ttl_s / 5 if margin_s is None else margin_s
+        self._expires_at = 0.0  # wall clock, as stored
+        self.acquired = 0
+        self.lost = 0
+        self._leader = False
+        self.last_error: Optional[str] = None
+        self._db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False, timeout=2.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SQL)
+
+    def try_acquire(self) -> bool:
+        now = time.time()
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+                if row is None or row[0] == self.holder or row[1] < now:
+                    acquired_at = now if (row is None or row[0] != self.holder) else None
+                    self._db.execute(
+                        "INSERT INTO leases (name, holder, expires_at, acquired_at) VALUES (?, ?, ?, ?)"
+                        " ON CONFLICT(name) DO UPDATE SET holder=excluded.holder, expires_at=excluded.expires_at,"
+                        " acquired_at=COALESCE(?, leases.acquired_at)",
+                        (self.name, self.holder, now + self.ttl_s, now, acquired_at))
+                    self._expires_at = now + self.ttl_s
+                else:
+                    self._expires_at = 0.0
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)  # keep whatever time we have left; held() runs it out
+        now_held = self.held()
+        if now_held and not self._leader:
+            self.acquired += 1
+        elif self._leader and not now_held:
+            self.lost += 1
+        self._leader = now_held
+        return now_held
+
+    def held(self) -> bool:
+        return time.time() < self._expires_at - self.margin_s
+
+    def release(self):
+        with contextlib.suppress(Exception):
+            self._db.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+        self._expires_at = 0.0
+
+    def current(self) -> Optional[dict]:
+        with contextlib.suppress(Exception):
+            row = self._db.execute("SELECT holder, expires_at, acquired_at FROM leases WHERE name = ?",
+                                   (self.name,)).fetchone()
+            if row:
+                return {"holder": row[0], "expires_in_s": round(row[1] - time.time(), 1), "acquired_at": row[2]}
+        return None
+
+    def close(self):
+        self.release()
+        with contextlib.suppress(Exception):
+            self._db.close()
+
+    def stats(self) -> dict:
+        return {"name": self.name, "holder": self.holder, "leader": self.held(), "ttl_s": self.ttl_s,
+                "acquired": self.acquired, "lost": self.lost, "current": self.current(), "last_error": self.last_error}
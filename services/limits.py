@@ -0,0 +1,78 @@
+# services/limits.py
+import asyncio, os, time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+LIMITS_REFRESH_S = float(os.getenv("LIMITS_REFRESH_S", "900"))
+LIMITS_TTL_S = float(os.getenv("LIMITS_TTL_S", "3600"))  # older entries are ignored (route is not pruned)
+LIMITS_CONCURRENCY = int(os.getenv("LIMITS_CONCURRENCY", "6"))
+
+# fetch(frm, net_from, to, net_to, rate_type) -> {"min": float|None, "max": float|None} in `frm` units
+RangeFetcher = Callable[[str, Optional[str], str, Optional[str], str], Awaitable[dict]]
+
+class LimitsTable:
+    """Per-provider, per-pair min/max amounts refreshed in the background. `check()` never does IO:
+    a pair with no (or an expired) entry is simply not pruned."""
+
+    def __init__(self, fetchers: Dict[str, RangeFetcher]):
+        self.fetchers = fetchers
+        self._entries: Dict[Tuple, dict] = {}
+        self.refreshed_at: Optional[float] = None
+        self.errors = 0
+
+    @staticmethod
+    def key(provider: str, frm: str, net_from: Optional[str], to: str, net_to: Optional[str], rate_type: str) -> Tuple:
+        return (provider, (frm or "").upper(), (net_from or "").upper(), (to or "").upper(), (net_to or "").upper(),
+                "fixed" if rate_type == "fixed" else "float")
+
+    async def refresh(self, legs: List[Tuple[str, Optional[str]]], rate_types=("float", "fixed")):
+        sem = asyncio.Semaphore(max(1, LIMITS_CONCURRENCY))
+
+        async def _one(provider: str, fetch: RangeFetcher, frm, nf, to, nt, rt):
+            async with sem:
+                try:
+                    lim = await fetch(frm, nf, to, nt, rt)
+                except Exception:
+                    self.errors += 1
+                    return
+            self._entries[self.key(provider, frm, nf, to, nt, rt)] = {
+                "min": lim.get("min"), "max": lim.get("max"), "ts": time.time()}
+
+        jobs = []
+        for provider, fetch in self.fetchers.items():
+            for asset, net in legs:
+                for rt in rate_types:
+                    jobs.append(_one(provider, fetch, asset, net, "XMR", None, rt))
+                    jobs.append(_one(provider, fetch, "XMR", None, asset, net, rt))
+        await asyncio.gather(*jobs)
+        self.refreshed_at = time.time()
+
+    async def run(self, legs: List[Tuple[str, Optional[str]]]):
+        while True:
+            await self.refresh(legs)
+            await asyncio.sleep(LIMITS_REFRESH_S)
+
+    def get(self, provider: str, frm: str, net_from: Optional[str], to: str, net_to: Optional[str],
+            rate_type: str) -> Optional[dict]:
+        e = self._entries.get(self.key(provider, frm, net_from, to, net_to, rate_type))
+        if e is None or time.time() - e["ts"] > LIMITS_TTL_S:
+            return None
+        return e
+
+    def check(self, provider: str, frm: str, net_from: Optional[str], to: str, net_to: Optional[str],
+              rate_type: str, amount: float) -> Optional[dict]:
+        """None if the amount may be quoted, else {'reason': 'below_min'|'above_max', 'min', 'max'}."""
+        e = self.get(provider, frm, net_from, to, net_to, rate_type)
+        if e is None:
+            return None
+        mn, mx = e.get("min"), e.get("max")
+        if mn and amount < float(mn):
+            return {"reason": "below_min", "min": float(mn), "max": mx}
+        if mx and amount > float(mx):
+            return {"reason": "above_max", "min": mn, "max": float(mx)}
+        return None
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {"entries": len(self._entries),
+                "fresh": sum(1 for e in self._entries.values() if now - e["ts"] <= LIMITS_TTL_S),
+                "refreshed_at": self.refreshed_at, "errors": self.errors}
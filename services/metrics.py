@@ -0,0 +1,136 @@
+# services/metrics.py
+import bisect, math, time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Minimal Prometheus text-format (0.0.4) exporter; no client library needed.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name, self.doc, self.labelnames = name, doc, tuple(labelnames)
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *a, **k):
+        super().__init__(*a, **k)
+        self._v: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._v[key] = self._v.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in self._v.items()]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *a, fn: Optional[Callable[[], float]] = None, **k):
+        super().__init__(*a, **k)
+        self._v: Dict[Tuple, float] = {}
+        self._fn = fn  # unlabelled gauges may be computed at scrape time
+
+    def set(self, value: float, **labels):
+        self._v[self._key(labels)] = float(value)
+
+    def render(self) -> List[str]:
+        if self._fn is not None:
+            try:
+                self._v[()] = float(self._fn())
+            except Exception:
+                pass
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in self._v.items()]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *a, buckets: Sequence[float] = LATENCY_BUCKETS, **k):
+        super().__init__(*a, **k)
+        self.buckets = tuple(sorted(buckets))
+        self._v: Dict[Tuple, list] = {}  # key -> [per-bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        row = self._v.get(key)
+        if row is None:
+            row = self._v[key] = [0] * len(self.buckets) + [0.0, 0]
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            row[i] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for k, row in self._v.items():
+            cum = 0
+            for b, c in zip(self.buckets, row):
+                cum += c
+                le = 'le="%s"' % _num(b)
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, k, le)} {cum}")
+            inf = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_labels(self.labelnames, k, inf)} {row[-1]}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, k)} {_num(row[-2])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, k)} {row[-1]}")
+        return out
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, m: _Metric):
+        if m.name in self._metrics:
+            raise ValueError(f"duplicate metric {m.name}")
+        self._metrics[m.name] = m
+        return m
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, doc, labelnames))
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = (), fn=None) -> Gauge:
+        return self._add(Gauge(name, doc, labelnames, fn=fn))
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics.values():
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+@asynccontextmanager
+async def timed_lock(lk, hist: Histogram, **labels):
+    """`async with timed_lock(lk, h, lock="x"):` acquires `lk`, observing how long the wait took."""
+    t0 = time.perf_counter()
+    async with lk:
+        hist.observe(time.perf_counter() - t0, **labels)
+        yield
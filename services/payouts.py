@@ -0,0 +1,111 @@
+# services/payouts.py
+import asyncio, os
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+PAYOUT_BATCH_MAX = int(os.getenv("PAYOUT_BATCH_MAX", "15"))  # Monero txs carry at most 16 outputs, one is change
+PAYOUT_BATCH_LINGER_S = float(os.getenv("PAYOUT_BATCH_LINGER_S", "0"))  # hold a forming batch open this long
+
+# transfer(destinations=[{"address", "amount" (atomic)}]) -> wallet `transfer` result (has "tx_hash")
+TransferFn = Callable[[List[Dict]], Awaitable[Dict]]
+
+class PayoutBatcher:
+    """Payout queue drained by one flusher task (`run()`), one wallet `transfer` at a time.
+
+    `submit()` only queues a payout and returns a future for its tx hash, so callers do not wait
+    on each other. The flusher sends everything pending as one multi-destination transfer (one
+    ring signature set, one fee): a lone payout goes out at once, and payouts submitted while a
+    transfer is in flight pile up for the next one. `linger_s` optionally holds a batch that
+    already has several payouts open a little longer for more.
+
+    If the batched transfer is *rejected* (`retry_single(exc)` is True, e.g. a wallet RPC error
+    such as not enough unlocked outputs for all of them), each payout is retried on its own. Any
+    other failure (timeouts, connection errors) fails the whole batch: the transfer may have gone
+    out, so re-sending could pay twice."""
+
+    def __init__(self, transfer: TransferFn, retry_single: Callable[[Exception], bool],
+                 max_dest: int = PAYOUT_BATCH_MAX, linger_s: float = PAYOUT_BATCH_LINGER_S):
+        self._transfer = transfer
+        self._retry_single = retry_single
+        self.max_dest = max(1, max_dest)
+        self.linger_s = linger_s
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._wake = asyncio.Event()
+        self.batches = 0
+        self.payouts = 0
+        self.fallbacks = 0
+        self.largest = 0
+
+    def submit(self, address: str, amount_atomic: int) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append(({"address": address, "amount": int(amount_atomic)}, fut))
+        self._wake.set()
+        return fut
+
+    def cancel_pending(self) -> int:
+        """Drop payouts not yet handed to the wallet (their futures are cancelled)."""
+        batch, self._pending = self._pending, []
+        for _, fut in batch:
+            fut.cancel()
+        return len(batch)
+
+    def _take(self) -> List[Tuple[Dict, asyncio.Future]]:
+        batch, seen, rest = [], set(), []
+        for dest, fut in self._pending:
+            if fut.done():
+                continue
+            if len(batch) < self.max_dest and dest["address"] not in seen:  # one output per address per tx
+                seen.add(dest["address"])
+                batch.append((dest, fut))
+            else:
+                rest.append((dest, fut))
+        self._pending = rest
+        return batch
+
+    async def run(self):
+        while True:
+            if not self._pending:
+                self._wake.clear()
+                await self._wake.wait()
+            if self.linger_s > 0 and 1 < len(self._pending) < self.max_dest:
+                await asyncio.sleep(self.linger_s)
+            batch = self._take()
+            if batch:
+                await self._send_batch(batch)
+
+    async def _send_batch(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        try:
+            hashes = await self._run([d for d, _ in batch])
+            for (_, fut), h in zip(batch, hashes):
+                if not fut.done():
+                    fut.set_result(h)
+        except Exception as e:
+            if len(batch) > 1 and self._retry_single(e):
+                self.fallbacks += 1
+                for d, fut in batch:
+                    await self._send_single(d, fut)
+                return
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+    async def _send_single(self, dest: Dict, fut: asyncio.Future):
+        try:
+            h = (await self._run([dest]))[0]
+            if not fut.done():
+                fut.set_result(h)
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+
+    async def _run(self, dests: List[Dict]) -> List[str]:
+        res = await self._transfer(dests)
+        self.batches += 1
+        self.payouts += len(dests)
+        self.largest = max(self.largest, len(dests))
+        return [res.get("tx_hash", "")] * len(dests)
+
+    def stats(self) -> dict:
+        return {"max_destinations": self.max_dest, "linger_s": self.linger_s, "pending": len(self._pending),
+                "transfers": self.batches, "payouts": self.payouts, "largest_batch": self.largest,
+                "avg_batch": round(self.payouts / self.batches, 2) if self.batches else None,
+                "fallbacks": self.fallbacks}
@@ -0,0 +1,70 @@
+# services/prices.py
+import asyncio, os, time
+from typing import Dict, Optional
+from .http_pool import http_client
+
+COINGECKO_URL = os.getenv("COINGECKO_URL", "https://api.coingecko.com/api/v3/simple/price")
+PRICE_REFRESH_S = float(os.getenv("PRICE_REFRESH_S", "60"))
+PRICE_MAX_AGE_S = float(os.getenv("PRICE_MAX_AGE_S", "300"))  # quotes refuse prices older than this
+
+CG_IDS = {"BTC": "bitcoin", "ETH": "ethereum", "USDT": "tether", "USDC": "usd-coin", "LTC": "litecoin", "XMR": "monero"}
+
+class PriceOracle:
+    """USD prices refreshed in the background; reads are served from memory with their age."""
+
+    def __init__(self, ids: Optional[Dict[str, str]] = None):
+        self.ids = dict(ids or CG_IDS)
+        self._prices: Dict[str, float] = {}
+        self.updated_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._kick: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        async with self._lock:
+            try:
+                r = await http_client("coingecko").get(COINGECKO_URL, params={"ids": ",".join(self.ids.values()), "vs_currencies": "usd"})
+                r.raise_for_status()
+                data = r.json()
+                fresh = {k: float(data.get(v, {}).get("usd", 0) or 0) for k, v in self.ids.items()}
+                if not any(v > 0 for v in fresh.values()):
+                    raise ValueError("no prices in response")
+                # keep the previous value for any symbol the response left out
+                self._prices.update({k: v for k, v in fresh.items() if v > 0})
+                self.updated_at = time.time()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e) or e.__class__.__name__
+
+    async def run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(PRICE_REFRESH_S)
+
+    def age(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    def is_stale(self, max_age_s: Optional[float] = None) -> bool:
+        a = self.age()
+        return a is None or a > (PRICE_MAX_AGE_S if max_age_s is None else max_age_s)
+
+    def check_fresh(self, max_age_s: Optional[float] = None) -> bool:
+        """True when prices are within max age. Never waits on CoinGecko: if the last refresh is
+        overdue (the background loop is failing or lagging) one more is started in the background."""
+        if self.is_stale(PRICE_REFRESH_S * 2) and not self._lock.locked() and self._kick is None:
+            self._kick = asyncio.create_task(self.refresh())
+            self._kick.add_done_callback(lambda _t: setattr(self, "_kick", None))
+        return not self.is_stale(max_age_s)
+
+    def get(self) -> Dict[str, float]:
+        return dict(self._prices)
+
+    def price(self, symbol: str) -> float:
+        return float(self._prices.get((symbol or "").upper(), 0.0) or 0.0)
+
+    def stats(self) -> dict:
+        a = self.age()
+        return {"prices": self.get(), "age_s": None if a is None else round(a, 1), "stale": self.is_stale(),
+                "max_age_s": PRICE_MAX_AGE_S, "refresh_s": PRICE_REFRESH_S, "last_error": self.last_error}
+
+PRICES = PriceOracle()
@@ -0,0 +1,98 @@
+# services/quote_cache.py
+import asyncio, math, os, time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+QUOTE_CACHE_TTL_S = float(os.getenv("QUOTE_CACHE_TTL_S", "20"))
+QUOTE_CACHE_EMPTY_TTL_S = float(os.getenv("QUOTE_CACHE_EMPTY_TTL_S", "2"))  # toAmount 0 ("no quote") answers
+QUOTE_CACHE_MAX = int(os.getenv("QUOTE_CACHE_MAX", "2048"))
+# relative width of an amount bucket (0.005 = amounts within ~0.5% share an entry)
+QUOTE_CACHE_BUCKET = float(os.getenv("QUOTE_CACHE_BUCKET", "0.005"))
+
+def amount_bucket(amount: float, width: float = QUOTE_CACHE_BUCKET) -> int:
+    if amount <= 0 or width <= 0:
+        return 0
+    return int(round(math.log(amount) / math.log1p(width)))
+
+class QuoteCache:
+    """TTL + LRU cache of provider estimates with single-flight coalescing.
+    Entries remember the amount they were fetched for; a hit for a nearby amount
+    in the same bucket scales `toAmount` linearly. Empty answers (`toAmount` 0) only live for
+    `empty_ttl_s`, so one bad upstream reply does not hide a provider for the full TTL."""
+
+    def __init__(self, ttl_s: float = QUOTE_CACHE_TTL_S, max_entries: int = QUOTE_CACHE_MAX,
+                 empty_ttl_s: float = QUOTE_CACHE_EMPTY_TTL_S):
+        self.ttl_s = ttl_s
+        self.empty_ttl_s = min(empty_ttl_s, ttl_s)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[float, float, dict]]" = OrderedDict()  # key -> (expires, amount, j)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.hits = self.misses = self.coalesced = 0
+
+    @staticmethod
+    def key(provider: str, frm: str, to: str, net_from: Optional[str], net_to: Optional[str],
+            amount: float, rate_type: str) -> Tuple:
+        return (provider, (frm or "").upper(), (to or "").upper(),
+                (net_from or "").upper(), (net_to or "").upper(), amount_bucket(amount), rate_type)
+
+    @staticmethod
+    def _scaled(j: dict, cached_amount: float, amount: float) -> dict:
+        out = dict(j)
+        to_amt = float(out.get("toAmount", 0) or 0)
+        if to_amt > 0 and cached_amount > 0:
+            out["toAmount"] = to_amt * (amount / cached_amount)
+        return out
+
+    def _get(self, key: Tuple, amount: float) -> Optional[dict]:
+        e = self._entries.get(key)
+        if e is None:
+            return None
+        expires, cached_amount, j = e
+        if time.monotonic() > expires:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return self._scaled(j, cached_amount, amount)
+
+    def _put(self, key: Tuple, amount: float, j: dict):
+        ttl = self.ttl_s if float(j.get("toAmount", 0) or 0) > 0 else self.empty_ttl_s
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, amount, j)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: Tuple, amount: float, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        if self.ttl_s <= 0:
+            return await fetch()
+        hit = self._get(key, amount)
+        if hit is not None:
+            self.hits += 1
+            return hit
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # Someone is already asking upstream for this bucket; share their answer.
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # its own task: a caller hitting its deadline must not cancel the call others wait on
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, amount, fetch))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())  # retrieved even if all callers left
+        j, fetched_amount = await asyncio.shield(task)
+        return j if fetched_amount == amount else self._scaled(j, fetched_amount, amount)
+
+    async def _fetch(self, key: Tuple, amount: float, fetch: Callable[[], Awaitable[dict]]) -> Tuple[dict, float]:
+        try:
+            j = await fetch()
+            if isinstance(j, dict):
+                self._put(key, amount, j)
+            return j, amount
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "inflight": len(self._inflight), "ttl_s": self.ttl_s,
+                "empty_ttl_s": self.empty_ttl_s,
+                "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
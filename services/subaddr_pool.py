@@ -0,0 +1,100 @@
+# services/subaddr_pool.py
+import asyncio, contextlib, os
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Iterable
+
+SUBADDR_POOL_SIZE = int(os.getenv("SUBADDR_POOL_SIZE", "20"))  # refill up to this many; 0 = no pool
+SUBADDR_POOL_LOW = int(os.getenv("SUBADDR_POOL_LOW", "5"))     # refill once fewer than this are left
+POOL_LABEL = "pool"
+
+# create(label) -> {"address", "address_index"}; label(index, label) relabels an existing subaddress
+CreateFn = Callable[[str], Awaitable[Dict]]
+LabelFn = Callable[[int, str], Awaitable[None]]
+
+class SubaddressPool:
+    """Subaddresses created ahead of time (label `pool…`) so a new swap takes one from memory.
+
+    `take()` hands out a pooled subaddress and relabels it in the background; when the pool is
+    empty (or disabled) it falls back to creating one inline. `run()` tops the pool back up to
+    `size` whenever it drops below `low`, one wallet call at a time.
+
+    The wallet label is cosmetic: callers must persist the assignment before using the address,
+    and pass every persisted index to `recover()`, which is what keeps it out of a later pool."""
+
+    def __init__(self, create: CreateFn, label: LabelFn, size: int = SUBADDR_POOL_SIZE,
+                 low: int = SUBADDR_POOL_LOW, tag: str = POOL_LABEL):
+        self._create, self._label = create, label
+        self.size = max(0, size)
+        self.low = min(max(0, low), self.size)
+        self.tag = tag  # label for pooled entries; distinct per process when several share a wallet
+        self._free: Deque[Dict] = deque()
+        self._wake = asyncio.Event()
+        self._bg = set()
+        self.taken = 0
+        self.fallbacks = 0
+        self.created = 0
+        self.recovered = 0
+        self.relabel_errors = 0
+        self.refill_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def _low(self) -> bool:
+        return len(self._free) < max(1, self.low)
+
+    async def take(self, label: str) -> Dict:
+        if self._free:
+            sub = self._free.popleft()
+            self.taken += 1
+            t = asyncio.create_task(self._relabel(sub["address_index"], label))
+            self._bg.add(t)
+            t.add_done_callback(self._bg.discard)
+        else:
+            self.fallbacks += 1
+            sub = await self._create(label)
+        if self._low():
+            self._wake.set()
+        return sub
+
+    async def _relabel(self, index: int, label: str):
+        try:
+            await self._label(index, label)
+        except Exception:
+            self.relabel_errors += 1  # cosmetic: the swap record is the source of truth
+
+    def recover(self, subaddresses: Iterable[Dict], in_use: Iterable[int]):
+        """Re-adopt pooled subaddresses from an earlier run (wallet `get_address` entries labelled
+        `tag` whose index no swap holds). Only safe when no other process draws from the same tag."""
+        used = set(in_use) | {s["address_index"] for s in self._free}
+        for a in subaddresses:
+            idx = int(a.get("address_index", 0))
+            if a.get("label") == self.tag and idx and idx not in used and a.get("address"):
+                self._free.append({"address": a["address"], "address_index": idx})
+                used.add(idx)
+                self.recovered += 1
+
+    async def run(self, retry_s: float = 30.0):
+        if self.size <= 0:
+            return
+        while True:
+            while len(self._free) < self.size:
+                try:
+                    sub = await self._create(self.tag)
+                except Exception:
+                    self.refill_errors += 1
+                    break  # wallet unavailable: take() falls back inline until the retry
+                self._free.append(sub)
+                self.created += 1
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), retry_s)
+            while not self._low():
+                self._wake.clear()
+                await self._wake.wait()
+
+    def stats(self) -> dict:
+        return {"size": self.size, "low_water": self.low, "free": len(self._free), "tag": self.tag,
+                "taken": self.taken, "fallbacks": self.fallbacks, "created": self.created,
+                "recovered": self.recovered, "refill_errors": self.refill_errors,
+                "relabel_errors": self.relabel_errors}
@@ -0,0 +1,395 @@
+# services/swap_store.py
+import asyncio, contextlib, hashlib, json, os, sqlite3, time
+from typing import Callable, Dict, List, Optional, Tuple
+
+JOURNAL_FSYNC_INTERVAL_S = float(os.getenv("JOURNAL_FSYNC_INTERVAL_S", "1.0"))
+JOURNAL_FSYNC_BATCH = int(os.getenv("JOURNAL_FSYNC_BATCH", "64"))
+JOURNAL_COMPACT_RECORDS = int(os.getenv("JOURNAL_COMPACT_RECORDS", "5000"))
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(8 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # wait for other workers' writes
+
+def _collapse_timeline(swap: Dict):
+    # collapse duplicate consecutive timeline entries for cleanliness
+    tl = swap.get("timeline")
+    if isinstance(tl, list) and tl:
+        collapsed = []
+        for e in tl:
+            if not collapsed or collapsed[-1] != e:
+                collapsed.append(e)
+        swap["timeline"] = collapsed
+
+def _digest(v) -> bytes:
+    return hashlib.blake2b(json.dumps(v, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"),
+                           digest_size=16).digest()
+
+class JournalSwapStore:
+    """Snapshot (swaps.json) + append-only journal of per-swap changes.
+
+    `save(swap)` appends one line holding only the top-level keys that changed since the
+    last write of that swap, so the cost follows the change, not the history. fsync is
+    batched by `run()`, which also compacts the journal into a fresh snapshot."""
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or (os.path.splitext(snapshot_path)[0] + ".journal")
+        self._rotated_path = self.journal_path + ".1"
+        self._digests: Dict[str, Dict[str, bytes]] = {}
+        self._fh = None
+        self._unsynced = 0
+        self._records = 0
+        self._bytes = 0
+        self._kick: Optional[asyncio.Event] = None
+        self._compacting = False
+        self.last_compact_ts: Optional[float] = None
+
+    # ---------- load ----------
+    def _replay(self, path: str, swaps: Dict[str, Dict]) -> int:
+        n = 0
+        if not os.path.exists(path):
+            return n
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue  # torn tail after a crash
+                sid = rec.get("id")
+                if not sid:
+                    continue
+                s = swaps.setdefault(sid, {})
+                s.update(rec.get("set") or {})
+                for k in rec.get("del") or []:
+                    s.pop(k, None)
+                n += 1
+        return n
+
+    def load(self) -> Dict[str, Dict]:
+        swaps: Dict[str, Dict] = {}
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        swaps = data
+        except Exception:
+            pass
+        # a crash mid-compaction can leave the rotated segment behind; its records are
+        # already part of (or older than) the snapshot, so replaying it is harmless
+        self._replay(self._rotated_path, swaps)
+        self._records = self._replay(self.journal_path, swaps)
+        self._bytes = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        for sid, s in swaps.items():
+            self._digests[sid] = {k: _digest(v) for k, v in s.items()}
+        return swaps
+
+    # ---------- write ----------
+    def _journal(self):
+        if self._fh is None:
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        return self._fh
+
+    def save(self, swap: Dict, durable: bool = False) -> int:
+        """Append the changed top-level keys of one swap. Returns bytes written (0 = no change).
+        `durable`: fsync before returning, for writes that must survive a crash before the next
+        step (e.g. a wallet send)."""
+        sid = swap.get("id")
+        if not sid:
+            return 0
+        _collapse_timeline(swap)
+        prev = self._digests.get(sid) or {}
+        cur = {k: _digest(v) for k, v in swap.items()}
+        changed = {k: swap[k] for k, d in cur.items() if prev.get(k) != d}
+        removed = [k for k in prev if k not in cur]
+        if not changed and not removed:
+            if durable:
+                self._fsync()  # an earlier, not yet synced write may hold this state
+            return 0
+        rec = {"id": sid, "ts": time.time(), "set": changed}
+        if removed:
+            rec["del"] = removed
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        fh = self._journal()
+        fh.write(line)
+        fh.flush()
+        self._digests[sid] = cur
+        self._unsynced += 1
+        self._records += 1
+        self._bytes += len(line.encode("utf-8"))
+        if durable:
+            self._fsync()
+        elif self._kick is not None and self._unsynced >= JOURNAL_FSYNC_BATCH:
+            self._kick.set()
+        return len(line)
+
+    def _fsync(self):
+        if self._fh is not None and self._unsynced:
+            self._unsynced = 0
+            os.fsync(self._fh.fileno())
+
+    def needs_compaction(self) -> bool:
+        return self._records >= JOURNAL_COMPACT_RECORDS or self._bytes >= JOURNAL_COMPACT_BYTES
+
+    async def compact(self, swaps: Dict[str, Dict]):
+        """Fold the journal into a new snapshot. Serialization happens on the loop (consistent view);
+        file IO runs in a thread while new changes go to a fresh journal segment."""
+        if self._compacting or not (self._records or os.path.exists(self.journal_path)):
+            return
+        self._compacting = True
+        try:
+            data = json.dumps(swaps, ensure_ascii=False, default=str)
+            self._fsync()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if os.path.exists(self.journal_path):
+                os.replace(self.journal_path, self._rotated_path)
+            self._records = 0
+            self._bytes = 0
+
+            def _write():
+                tmp = self.snapshot_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.snapshot_path)
+                if os.path.exists(self._rotated_path):
+                    os.remove(self._rotated_path)
+            await asyncio.to_thread(_write)
+            self.last_compact_ts = time.time()
+        finally:
+            self._compacting = False
+
+    async def run(self, swaps: Dict[str, Dict]):
+        """Background loop: batched fsync + compaction when the journal grows past its limits."""
+        self._kick = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._kick.wait(), timeout=JOURNAL_FSYNC_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+            self._kick.clear()
+            try:
+                if self._unsynced and self._fh is not None:
+                    self._unsynced = 0
+                    await asyncio.to_thread(os.fsync, self._fh.fileno())
+                if self.needs_compaction():
+                    await self.compact(swaps)
+            except Exception:
+                pass
+
+    def close(self):
+        try:
+            self._fsync()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def stats(self) -> dict:
+        return {"backend": "journal", "journal_records": self._records, "journal_bytes": self._bytes,
+                "unsynced": self._unsynced, "last_compact_ts": self.last_compact_ts}
+
+# ================== SQLite backend ==================
+_SQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS swaps (
+    id TEXT PRIMARY KEY,
+    created REAL,
+    updated REAL,
+    status_bucket TEXT,
+    leg1_provider TEXT,
+    leg2_provider TEXT,
+    in_asset TEXT,
+    in_network TEXT,
+    out_asset TEXT,
+    out_network TEXT,
+    amount REAL,
+    subaddr TEXT,
+    subaddr_index INTEGER,
+    leg2_status TEXT,
+    our_fee_xmr REAL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_swaps_created ON swaps(created);
+CREATE INDEX IF NOT EXISTS ix_swaps_bucket_created ON swaps(status_bucket, created);
+CREATE INDEX IF NOT EXISTS ix_swaps_leg1_provider ON swaps(leg1_provider);
+CREATE INDEX IF NOT EXISTS ix_swaps_leg2_provider ON swaps(leg2_provider);
+CREATE INDEX IF NOT EXISTS ix_swaps_assets ON swaps(in_asset, out_asset);
+CREATE INDEX IF NOT EXISTS ix_swaps_subaddr ON swaps(subaddr);
+CREATE INDEX IF NOT EXISTS ix_swaps_subaddr_index ON swaps(subaddr_index);
+"""
+
+def _search_text(swap: Dict) -> str:
+    # same fields the in-memory admin search looks at
+    return " ".join([
+        str(swap.get("id", "")),
+        str(swap.get("subaddr") or ""),
+        json.dumps(swap.get("req", {})),
+        json.dumps(swap.get("leg1", {})),
+        json.dumps(swap.get("leg2", {})),
+    ]).lower()
+
+class SqliteSwapStore:
+    """stdlib sqlite3 swap store: one row per swap (full JSON doc + indexed columns) and a
+    trigram FTS5 table for admin free-text search (plain table + LIKE when FTS5 is missing).
+    Imports the JSON snapshot/journal on first start.
+
+    Safe to share between processes (WAL): every write bumps a store-wide `seq`, and `changes()`
+    returns the docs other writers changed since the last call."""
+
+    def __init__(self, db_path: str, bucket_fn: Callable[[Dict], str], import_from: Optional[str] = None):
+        self.db_path = db_path
+        self.bucket_fn = bucket_fn
+        self.import_from = import_from
+        self._digests: Dict[str, bytes] = {}
+        self.fts = False
+        self.imported = 0
+        self.cursor = 0  # highest seq seen by load()/changes()
+        self._db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._db.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SQL_SCHEMA)
+        if "seq" not in {r[1] for r in self._db.execute("PRAGMA table_info(swaps)")}:
+            with contextlib.suppress(sqlite3.OperationalError):  # another worker may have just added it
+                self._db.execute("ALTER TABLE swaps ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_swaps_seq ON swaps(seq)")
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS swaps_fts USING fts5(id UNINDEXED, body, tokenize='trigram')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            self._db.execute("CREATE TABLE IF NOT EXISTS swaps_fts (docid INTEGER PRIMARY KEY, id TEXT, body TEXT)")
+
+    def _upsert(self, swap: Dict, doc: str):
+        req = swap.get("req") or {}
+        leg1 = swap.get("leg1") or {}
+        leg2 = swap.get("leg2") or {}
+        subidx = swap.get("subaddr_index")
+        cols = ("id", "seq", "created", "updated", "status_bucket", "leg1_provider", "leg2_provider",
+                "in_asset", "in_network", "out_asset", "out_network", "amount", "subaddr", "subaddr_index",
+                "leg2_status", "our_fee_xmr", "doc")
+        # callers hold a write transaction, so MAX(seq)+1 is unique across processes
+        seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM swaps").fetchone()[0]
+        vals = (swap["id"], seq, swap.get("created"), time.time(), self.bucket_fn(swap),
+                leg1.get("provider"), leg2.get("provider"),
+                req.get("in_asset"), req.get("in_network"), req.get("out_asset"), req.get("out_network"),
+                req.get("amount"), swap.get("subaddr"), subidx if isinstance(subidx, int) else None,
+                leg2.get("status"), swap.get("our_fee_xmr"), doc)
+        # upsert keeps the rowid stable so the search row can be addressed by it
+        self._db.execute(
+            f"INSERT INTO swaps ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+            f" ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c}=excluded.{c}' for c in cols[1:])}", vals)
+        rowid = self._db.execute("SELECT rowid FROM swaps WHERE id = ?", (swap["id"],)).fetchone()[0]
+        self._db.execute("DELETE FROM swaps_fts WHERE rowid = ?", (rowid,))
+        self._db.execute("INSERT INTO swaps_fts (rowid, id, body) VALUES (?, ?, ?)", (rowid, swap["id"], _search_text(swap)))
+
+    def load(self) -> Dict[str, Dict]:
+        empty = self._db.execute("SELECT COUNT(*) FROM swaps").fetchone()[0] == 0
+        if empty and self.import_from and os.path.exists(self.import_from):
+            legacy = JournalSwapStore(self.import_from).load()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # re-check under the write lock: a sibling worker may have imported already
+                if self._db.execute("SELECT COUNT(*) FROM swaps").fetchone()[0] == 0:
+                    for sid, s in legacy.items():
+                        s.setdefault("id", sid)
+                        self._upsert(s, json.dumps(s, ensure_ascii=False, default=str))
+                    self.imported = len(legacy)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        swaps: Dict[str, Dict] = {}
+        for sid, seq, doc in self._db.execute("SELECT id, seq, doc FROM swaps ORDER BY created"):
+            self.cursor = max(self.cursor, seq or 0)
+            with contextlib.suppress(Exception):
+                swaps[sid] = json.loads(doc)
+                self._digests[sid] = _digest(swaps[sid])
+        return swaps
+
+    def get(self, swap_id: str) -> Optional[Dict]:
+        row = self._db.execute("SELECT doc FROM swaps WHERE id = ?", (swap_id,)).fetchone()
+        if row is None:
+            return None
+        swap = json.loads(row[0])
+        self._digests[swap_id] = _digest(swap)
+        return swap
+
+    def changes(self, limit: int = 1000) -> List[Dict]:
+        """Docs written since the last call whose content differs from what this process last
+        saved or read (i.e. other workers' writes)."""
+        out = []
+        rows = self._db.execute("SELECT id, seq, doc FROM swaps WHERE seq > ? ORDER BY seq LIMIT ?",
+                                (self.cursor, limit)).fetchall()
+        for sid, seq, doc in rows:
+            self.cursor = max(self.cursor, seq)
+            with contextlib.suppress(Exception):
+                swap = json.loads(doc)
+                d = _digest(swap)
+                if self._digests.get(sid) != d:
+                    self._digests[sid] = d
+                    out.append(swap)
+        return out
+
+    def save(self, swap: Dict, durable: bool = False) -> int:
+        """`durable`: commit under synchronous=FULL, so the WAL (this write and every earlier
+        one) is fsynced before returning. NORMAL commits can be lost on power failure."""
+        sid = swap.get("id")
+        if not sid:
+            return 0
+        _collapse_timeline(swap)
+        d = _digest(swap)
+        if self._digests.get(sid) == d and not durable:
+            return 0
+        doc = json.dumps(swap, ensure_ascii=False, default=str)
+        if durable:
+            self._db.execute("PRAGMA synchronous=FULL")
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._upsert(swap, doc)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        finally:
+            if durable:
+                self._db.execute("PRAGMA synchronous=NORMAL")
+        self._digests[sid] = d
+        return len(doc)
+
+    def query(self, status: Optional[str], q: Optional[str], offset: int, limit: int) -> Tuple[int, List[Dict]]:
+        """Admin list/search: filter by bucket and free text, paginate in SQL."""
+        where, args = [], []
+        if status:
+            where.append("s.status_bucket = ?")
+            args.append(status)
+        if q:
+            like = "%" + q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            where.append("s.rowid IN (SELECT rowid FROM swaps_fts WHERE body LIKE ? ESCAPE '\\')")
+            args.append(like)
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        total = self._db.execute(f"SELECT COUNT(*) FROM swaps s{clause}", args).fetchone()[0]
+        cur = self._db.execute(
+            "SELECT s.id, s.created, s.in_asset, s.in_network, s.out_asset, s.out_network, s.amount,"
+            " s.leg1_provider, s.leg2_provider, s.status_bucket, s.leg2_status, s.our_fee_xmr"
+            f" FROM swaps s{clause} ORDER BY s.created LIMIT ? OFFSET ?", args + [limit, offset])
+        cols = ["id", "created_ts", "in_asset", "in_network", "out_asset", "out_network", "amount",
+                "leg1_provider", "leg2_provider", "status_bucket", "leg2_status", "our_fee_xmr"]
+        return total, [dict(zip(cols, row)) for row in cur.fetchall()]
+
+    async def compact(self, swaps: Dict[str, Dict]):
+        with contextlib.suppress(Exception):
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def run(self, swaps: Dict[str, Dict]):
+        return  # WAL commits are durable enough per write; nothing to batch
+
+    def close(self):
+        with contextlib.suppress(Exception):
+            self._db.close()
+
+    def stats(self) -> dict:
+        n = self._db.execute("SELECT COUNT(*) FROM swaps").fetchone()[0]
+        return {"backend": "sqlite", "path": self.db_path, "rows": n, "fts5": self.fts, "imported": self.imported,
+                "cursor": self.cursor}
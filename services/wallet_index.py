@@ -0,0 +1,91 @@
+# services/wallet_index.py
+import asyncio, os, time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+WALLET_INDEX_MAX_AGE_S = float(os.getenv("WALLET_INDEX_MAX_AGE_S", "5"))
+WALLET_INDEX_REORG_DEPTH = int(os.getenv("WALLET_INDEX_REORG_DEPTH", "10"))
+
+class IncomingTransferIndex:
+    """Per-subaddress received totals for account 0, fed by one `get_transfers` call for all
+    subaddresses. Confirmed transfers are pulled incrementally via `min_height` (re-reading the last
+    WALLET_INDEX_REORG_DEPTH blocks); the mempool is re-read on each refresh. Refreshes are
+    single-flight and at most once per `max_age_s`, so any number of callers share one RPC."""
+
+    def __init__(self, rpc: Callable[[str, dict], Awaitable[dict]], max_age_s: float = WALLET_INDEX_MAX_AGE_S):
+        self._rpc = rpc
+        self.max_age_s = max_age_s
+        self._confirmed: Dict[int, Dict[Tuple, float]] = {}  # subaddr index -> {(txid, amount): xmr}
+        self._confirmed_h: Dict[Tuple, int] = {}             # (subidx, txid, amount) -> height
+        self._pool: Dict[int, Dict[Tuple, float]] = {}
+        self._height = 0
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+    @staticmethod
+    def _subidx(t: dict) -> Optional[int]:
+        si = t.get("subaddr_index")
+        if isinstance(si, dict):
+            si = si.get("minor")
+        try:
+            return int(si)
+        except Exception:
+            return None
+
+    async def refresh(self):
+        min_h = max(0, self._height - WALLET_INDEX_REORG_DEPTH)
+        params = {"in": True, "pool": True, "account_index": 0}
+        if min_h > 0:
+            params.update(filter_by_height=True, min_height=min_h)
+        res = await self._rpc("get_transfers", params)
+
+        # drop confirmed entries inside the re-read window; they come back if still valid
+        for key in [k for k, h in self._confirmed_h.items() if h > min_h]:
+            self._confirmed_h.pop(key, None)
+            self._confirmed.get(key[0], {}).pop(key[1:], None)
+        for t in res.get("in", []) or []:
+            idx = self._subidx(t)
+            if idx is None:
+                continue
+            key = (t.get("txid"), t.get("amount"))
+            h = int(t.get("height") or 0)
+            self._confirmed.setdefault(idx, {})[key] = float(t.get("amount", 0)) / 1e12
+            self._confirmed_h[(idx,) + key] = h
+            self._height = max(self._height, h)
+
+        pool: Dict[int, Dict[Tuple, float]] = {}
+        for t in res.get("pool", []) or []:
+            idx = self._subidx(t)
+            if idx is None:
+                continue
+            pool.setdefault(idx, {})[(t.get("txid"), t.get("amount"))] = float(t.get("amount", 0)) / 1e12
+        self._pool = pool
+        self._refreshed_at = time.monotonic()
+        self.refreshes += 1
+
+    async def ensure_fresh(self, max_age_s: Optional[float] = None):
+        max_age = self.max_age_s if max_age_s is None else max_age_s
+        if time.monotonic() - self._refreshed_at <= max_age:
+            return
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at <= max_age:
+                return  # someone refreshed while we waited
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+    def received(self, address_index: int) -> float:
+        """pool + in (mempool + confirmed), a tx seen in both only counted once"""
+        seen = dict(self._confirmed.get(address_index, {}))
+        for key, amt in self._pool.get(address_index, {}).items():
+            seen.setdefault(key, amt)
+        return sum(seen.values())
+
+    def stats(self) -> dict:
+        return {"subaddresses": len(self._confirmed), "height": self._height, "refreshes": self.refreshes,
+                "age_s": round(time.monotonic() - self._refreshed_at, 3) if self._refreshed_at else None,
+                "last_error": self.last_error}
@@ -0,0 +1,79 @@
+# services/wallet_ledger.py
+import asyncio, os, time
+from typing import Awaitable, Callable, Dict
+
+WALLET_HEIGHT_TTL_S = float(os.getenv("WALLET_HEIGHT_TTL_S", "10"))  # how long a get_height answer is trusted
+
+RpcFn = Callable[[str, dict], Awaitable[dict]]
+
+class WalletLedger:
+    """Unlocked balance (atomic units) cached per block height, minus amounts reserved for sends
+    that are in flight.
+
+    Outputs only unlock when a block arrives, so `get_balance` is asked again only once
+    `get_height` moves (checked at most every `height_ttl_s`) or after a send/rejection calls
+    `invalidate()`. `reserve()` checks and books funds without awaiting in between, so parallel
+    sends never count the same unlocked piconero twice."""
+
+    def __init__(self, rpc: RpcFn, height_ttl_s: float = WALLET_HEIGHT_TTL_S):
+        self._rpc = rpc
+        self.height_ttl_s = height_ttl_s
+        self._lock = asyncio.Lock()
+        self._height = None
+        self._height_at = 0.0
+        self._balance_height = None  # height the cached balance was read at
+        self._unlocked = 0
+        self._stale = True
+        self._reserved: Dict[str, int] = {}
+        self.balance_calls = 0
+        self.height_calls = 0
+        self.denied = 0
+
+    async def _refresh(self):
+        async with self._lock:
+            now = time.monotonic()
+            if not self._stale and now - self._height_at < self.height_ttl_s:
+                return
+            res = await self._rpc("get_height", {})
+            self.height_calls += 1
+            self._height, self._height_at = int(res.get("height", 0)), time.monotonic()
+            if self._stale or self._height != self._balance_height:
+                res = await self._rpc("get_balance", {"account_index": 0})
+                self.balance_calls += 1
+                self._unlocked = int(res.get("unlocked_balance", 0))
+                self._balance_height, self._stale = self._height, False
+
+    def reserved(self) -> int:
+        return sum(self._reserved.values())
+
+    async def reserve(self, key: str, amount: int) -> bool:
+        if key in self._reserved:
+            return True
+        await self._refresh()
+        if self._unlocked - self.reserved() < amount:
+            self.denied += 1
+            return False
+        self._reserved[key] = int(amount)
+        return True
+
+    def hold(self, key: str, amount: int):
+        """Re-book a reservation unconditionally (jobs recovered after a restart already own their funds)."""
+        self._reserved[key] = int(amount)
+
+    def release(self, key: str, spent: bool = False):
+        self._reserved.pop(key, None)
+        if spent:
+            self.invalidate()  # the send also locked its change outputs: only the wallet knows the new figure
+
+    def invalidate(self):
+        self._stale = True
+
+    def clear(self):
+        self._reserved.clear()
+        self.invalidate()
+
+    def stats(self) -> dict:
+        return {"height": self._height, "balance_height": self._balance_height, "stale": self._stale,
+                "unlocked_atomic": self._unlocked, "reserved_atomic": self.reserved(),
+                "reservations": len(self._reserved), "denied": self.denied,
+                "get_balance_calls": self.balance_calls, "get_height_calls": self.height_calls}
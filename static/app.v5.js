@@ -254,17 +254,43 @@ $("btnStart").addEventListener("click", async () => {
 
 /* ---------- Status ---------- */
 $("btnStatus").addEventListener("click", () => fetchStatus());
-$("btnWatch").addEventListener("click", () => {
-  if (pollTimer) clearInterval(pollTimer);
-  fetchStatus();
-  pollTimer = setInterval(fetchStatus, 3000);
-});
-$("btnStop").addEventListener("click", () => {
+let statusEvents = null;
+function stopWatching() {
   if (pollTimer) {
     clearInterval(pollTimer);
     pollTimer = null;
   }
+  if (statusEvents) {
+    statusEvents.close();
+    statusEvents = null;
+  }
+}
+$("btnWatch").addEventListener("click", () => {
+  stopWatching();
+  const id = $("swapId").value.trim();
+  if (!id) return;
+  // Prefer the push stream; fall back to polling if the browser or connection can't do SSE
+  if (window.EventSource) {
+    statusEvents = new EventSource(`/api/status/${encodeURIComponent(id)}/events`);
+    statusEvents.onmessage = (ev) => {
+      try {
+        const j = JSON.parse(ev.data);
+        if (j.swap) drawSteps(j.swap);
+        if (j.type === "terminal") stopWatching();
+      } catch (e) { console.error(e); }
+    };
+    statusEvents.onerror = () => {
+      if (statusEvents && statusEvents.readyState === EventSource.CLOSED) {
+        statusEvents = null;
+        if (!pollTimer) pollTimer = setInterval(fetchStatus, 3000);
+      }
+    };
+    return;
+  }
+  fetchStatus();
+  pollTimer = setInterval(fetchStatus, 3000);
 });
+$("btnStop").addEventListener("click", () => stopWatching());
 
 async function fetchStatus() {
   const id = $("swapId").value.trim();
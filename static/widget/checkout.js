@@ -90,6 +90,8 @@
 
   // ----- UI bits -----
   let pollTimer = null;
+  let statusEvents = null;
+  function closeStatusEvents() { if (statusEvents) { statusEvents.close(); statusEvents = null; } }
   let timerHandle = null;
   let hadProviderQR = false;
   let finalized = false;
@@ -129,6 +131,7 @@
   function showTimer(show) { const tl = $("timeLeft"); if (!tl) return; tl.parentElement.style.visibility = show ? "visible" : "hidden"; }
   function expireUI() {
     if (pollTimer) { clearInterval(pollTimer); pollTimer = null; }
+    closeStatusEvents();
     const q = $("qrBox"); if (q) q.innerHTML = "";
     setAddr("—");
     const btn = $("copyBtn"); if (btn) { btn.disabled = true; btn.textContent = "Expired"; }
@@ -533,6 +536,7 @@
     if (finalized) return;
     finalized = true;
     if (pollTimer) { clearInterval(pollTimer); pollTimer = null; }
+    closeStatusEvents();
     showTimer(false); clearDeadline(swapId);
     const box = $("qrBox");
     if (box) {
@@ -652,6 +656,24 @@
       return;
     }
 
-    pollTimer = setInterval(pollOnce, 5000);
+    // Push channel: each backend event triggers an immediate (cheap, cached) status read, so the
+    // interval poll only remains as a slow safety net. Falls back to 5s polling if SSE fails.
+    if (window.EventSource && endpoint.startsWith("/api/status/")) {
+      statusEvents = new EventSource(endpoint + "/events");
+      statusEvents.onmessage = (ev) => {
+        pollOnce();
+        try { if (JSON.parse(ev.data).type === "terminal") closeStatusEvents(); } catch (_) {}
+      };
+      statusEvents.onerror = () => {
+        if (statusEvents && statusEvents.readyState === EventSource.CLOSED) {
+          statusEvents = null;
+          if (pollTimer) clearInterval(pollTimer);
+          if (!finalized) pollTimer = setInterval(pollOnce, 5000);
+        }
+      };
+      pollTimer = setInterval(pollOnce, 30000);
+    } else {
+      pollTimer = setInterval(pollOnce, 5000);
+    }
   })();
 })();